@@ -1,62 +1,159 @@
 # api.py
 """TopstepX API client"""
+import base64
 import requests
 import logging
 import time
-import urllib3.util.connection as urllib3_cn
-import socket
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from typing import Optional, Dict, List, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Callable, Optional, Dict, List, Mapping, Tuple
 from config import config
+from http_client import SESSION
 
+try:
+    import orjson
 
-# Force all requests (urllib3) to IPv4 sockets only
-def _force_ipv4():
-    """Force urllib3 to use IPv4 only"""
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback
+    import json
 
-    def allowed_gai_family():
-        return socket.AF_INET  # IPv4 only
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
-    urllib3_cn.allowed_gai_family = allowed_gai_family
+    _loads = json.loads
 
 
-_force_ipv4()
+# Worker pool for overlapping independent broker calls (shares SESSION's connection pool)
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api")
 
+# Separate pool for fan-out cancels, so cancels issued from _EXECUTOR tasks can't starve it
+_CANCEL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cancel")
 
-# Shared resilient HTTP session
-def _make_session() -> requests.Session:
-    """Create a requests session with retry logic and connection pooling"""
-    s = requests.Session()
-    retry = Retry(
-        total=config.http_retry_total,
-        connect=config.http_retry_connect,
-        read=config.http_retry_read,
-        backoff_factor=config.http_backoff_factor,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET", "POST", "PUT", "DELETE", "PATCH")
-    )
-    adapter = HTTPAdapter(
-        max_retries=retry,
-        pool_connections=10,
-        pool_maxsize=20,
-        pool_block=False
-    )
-    s.mount("https://", adapter)
-    s.mount("http://", adapter)
-    return s
+# Cache for contract ID lookups (LRU-bounded; keyed by raw and normalized symbol)
+CONTRACT_ID_MAP: "OrderedDict[str, str]" = OrderedDict()
+CONTRACT_ID_MAP_MAXSIZE = 256
+
+# Negative cache for unknown symbols: normalized symbol -> monotonic ts of the failed lookup
+_CONTRACT_MISSES: Dict[str, float] = {}
+CONTRACT_MISS_TTL_S = 300
+
+# Short-lived open-orders snapshots: account_id -> (monotonic ts the fetch started, orders)
+_open_orders_cache: Dict[int, Tuple[float, List[Dict]]] = {}
+# Bumped by every invalidation; a fetch that straddles one must not write its result back
+_open_orders_gen: Dict[int, int] = {}
+_open_orders_lock = threading.Lock()
+# account_id -> (snapshot list it was built from, {order id: order})
+_open_orders_index: Dict[int, Tuple[List[Dict], Dict[Any, Dict]]] = {}
 
 
-SESSION = _make_session()
+# Endpoint URLs, built once at import
+_URLS = SimpleNamespace(
+    auth=f"{config.topstep_api_base}/api/Auth/loginKey",
+    account_search=f"{config.topstep_api_base}/api/Account/search",
+    contract_search=f"{config.topstep_api_base}/api/Contract/search",
+    order_place=f"{config.topstep_api_base}/api/Order/place",
+    order_search_open=f"{config.topstep_api_base}/api/Order/searchOpen",
+    order_cancel=f"{config.topstep_api_base}/api/Order/cancel",
+    position_search_open=f"{config.topstep_api_base}/api/Position/searchOpen",
+    position_close_contract=f"{config.topstep_api_base}/api/Position/closeContract",
+)
 
-# Cache for contract ID lookups
-CONTRACT_ID_MAP: Dict[str, str] = {}
 
+@lru_cache(maxsize=2)
+def _bearer_header(token: str) -> Mapping[str, str]:
+    """Build (once per token) a read-only authorization + JSON content-type header mapping"""
+    return MappingProxyType({"Authorization": f"Bearer {token}", "Content-Type": "application/json"})
 
-def _auth_header(token: Optional[str] = None) -> Dict[str, str]:
+
+def _auth_header(token: Optional[str] = None) -> Mapping[str, str]:
     """Generate authorization header"""
-    token = token or config.topstep_token
-    return {"Authorization": f"Bearer {token}"}
+    return _bearer_header(token or config.topstep_token)
+
+
+def submit(fn: Callable[..., Any], *args, **kwargs) -> Future:
+    """
+    Run a blocking API call on the shared worker pool.
+
+    Lets callers overlap independent order POSTs (e.g. a market leg and a
+    limit leg) instead of paying each round-trip serially.
+
+    Returns:
+        Future resolving to the call's return value
+    """
+    return _EXECUTOR.submit(fn, *args, **kwargs)
+
+
+def _post(
+        url: str,
+        payload: Dict,
+        token: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None
+) -> requests.Response:
+    """
+    POST a pre-serialized JSON body on the shared session.
+
+    Args:
+        url: Endpoint URL (see _URLS)
+        payload: JSON-serializable request body
+        token: Bearer token (uses config if not provided)
+        headers: Explicit headers, replacing the bearer header
+
+    Returns:
+        requests.Response
+    """
+    if headers is None:
+        headers = _auth_header(token)
+    return SESSION.post(url, data=_dumps(payload), headers=headers, timeout=config.http_timeout)
+
+
+def prewarm_connection() -> threading.Thread:
+    """
+    Open a pooled TLS connection to the API host in the background.
+
+    Takes DNS + TCP + TLS setup off the critical path of the first real
+    request (authentication, then the first order).
+
+    Returns:
+        The started daemon thread
+    """
+    def _warm():
+        try:
+            SESSION.head(config.topstep_api_base, timeout=config.http_timeout)
+        except Exception:
+            logging.debug("Connection pre-warm failed", exc_info=True)
+
+    t = threading.Thread(target=_warm, daemon=True, name="api-prewarm")
+    t.start()
+    return t
+
+
+def _keepalive_loop(interval_s: float):
+    """Periodically touch the API host so the pooled TLS connection isn't torn down while idle"""
+    while True:
+        time.sleep(interval_s)
+        try:
+            SESSION.head(config.topstep_api_base, timeout=config.http_timeout)
+        except Exception:
+            logging.debug("Keep-alive ping failed", exc_info=True)
+
+
+def start_keepalive(interval_s: float = 30.0) -> threading.Thread:
+    """
+    Start the background keep-alive pinger for the TopstepX connection pool.
+
+    Args:
+        interval_s: Seconds between pings
+
+    Returns:
+        The started daemon thread
+    """
+    t = threading.Thread(target=_keepalive_loop, args=(interval_s,), daemon=True, name="api-keepalive")
+    t.start()
+    return t
 
 
 # ── Authentication ─────────────────────────────────────────────────────────────
@@ -71,27 +168,84 @@ def authenticate_topstepx() -> str:
     Raises:
         requests.HTTPError: If authentication fails
     """
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Auth/loginKey",
-        json={
+    r = _post(
+        _URLS.auth,
+        {
             "userName": config.topstep_username,
             "apiKey": config.topstep_api_key
         },
         headers={"Accept": "text/plain", "Content-Type": "application/json"},
-        timeout=config.http_timeout,
     )
     r.raise_for_status()
-    token = r.json()["token"]
-    config.topstep_token = token
+    token = _loads(r.content)["token"]
+    with config.token_lock:
+        config.topstep_token = token
+        config.token_expiry_ms = _token_expiry_ms(token)
+    _bearer_header.cache_clear()
     logging.info("✅ Authenticated with TopstepX")
     return token
 
 
+def _token_expiry_ms(token: str) -> int:
+    """
+    Expiry of a JWT in epoch ms, read from its `exp` claim.
+
+    Falls back to one refresh interval from now if the token can't be decoded.
+    """
+    try:
+        claims = token.split(".")[1]
+        claims += "=" * (-len(claims) % 4)
+        return int(_loads(base64.urlsafe_b64decode(claims))["exp"]) * 1000
+    except Exception:
+        return int(time.time() * 1000) + int(config.auth_refresh_hours * 3600 * 1000)
+
+
 # ── Account Management ─────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=4)
+def _fetch_account_id(token: str) -> int:
+    """
+    Look up the trading account ID for a token (memoized per token).
+
+    Picks the account named by config.account_name when set, otherwise the
+    only account the API reports as tradable.
+
+    Raises:
+        RuntimeError: If no matching active account found, or if several
+            accounts can trade and TOPSTEP_ACCOUNT_NAME is not set
+        requests.HTTPError: If API call fails
+    """
+    r = _post(_URLS.account_search, {"onlyActiveAccounts": True}, token)
+    r.raise_for_status()
+
+    accounts = _loads(r.content).get("accounts", [])
+    if not accounts:
+        raise RuntimeError("❌ No active accounts found.")
+
+    if config.account_name:
+        wanted = config.account_name.strip().lower()
+        acct = next((a for a in accounts if str(a.get("name", "")).lower() == wanted), None)
+        if acct is None:
+            raise RuntimeError(f"❌ Account '{config.account_name}' not found among active accounts.")
+    else:
+        tradable = [a for a in accounts if a.get("canTrade", a.get("active", True))]
+        if not tradable:
+            raise RuntimeError("❌ No tradable accounts found.")
+        if len(tradable) > 1:
+            names = ", ".join(str(a.get("name")) for a in tradable)
+            raise RuntimeError(
+                f"❌ {len(tradable)} tradable accounts found ({names}); "
+                "set TOPSTEP_ACCOUNT_NAME in .env to choose one."
+            )
+        acct = tradable[0]
+
+    logging.info(f"✅ Account: {acct['name']} (ID={acct['id']})")
+    return acct["id"]
+
+
 def get_account_id(token: Optional[str] = None) -> int:
     """
-    Get first active account ID and cache it.
+    Get the trading account ID and cache it.
 
     Args:
         token: Optional authentication token (uses config if not provided)
@@ -106,31 +260,50 @@ def get_account_id(token: Optional[str] = None) -> int:
     if config.account_id:
         return config.account_id
 
-    token = token or config.topstep_token
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Account/search",
-        json={"onlyActiveAccounts": True},
-        headers=_auth_header(token),
-        timeout=config.http_timeout,
-    )
-    r.raise_for_status()
-
-    accounts = r.json().get("accounts", [])
-    if not accounts:
-        raise RuntimeError("❌ No active accounts found.")
-
-    acct = accounts[2]
-    config.account_id = acct["id"]
-    logging.info(f"✅ Account: {acct['name']} (ID={config.account_id})")
+    config.account_id = _fetch_account_id(token or config.topstep_token)
     return config.account_id
 
 
 # ── Contract Management ────────────────────────────────────────────────────────
 
+def _contract_cache_get(key: str) -> Optional[str]:
+    """Return a cached contract ID and mark it most recently used"""
+    contract_id = CONTRACT_ID_MAP.get(key)
+    if contract_id:
+        try:
+            CONTRACT_ID_MAP.move_to_end(key)
+        except KeyError:
+            pass  # evicted concurrently; value is still valid
+    return contract_id
+
+
+def _contract_cache_put(key: str, contract_id: str):
+    """Cache a contract ID, evicting the least recently used entries past the bound"""
+    CONTRACT_ID_MAP[key] = contract_id
+    CONTRACT_ID_MAP.move_to_end(key)
+    while len(CONTRACT_ID_MAP) > CONTRACT_ID_MAP_MAXSIZE:
+        try:
+            CONTRACT_ID_MAP.popitem(last=False)
+        except KeyError:
+            break
+
+
+def _remember_contract_miss(symbol: str):
+    """Record a failed symbol lookup, dropping expired misses so the table stays small"""
+    now = time.monotonic()
+    for sym, ts in list(_CONTRACT_MISSES.items()):
+        if now - ts >= CONTRACT_MISS_TTL_S:
+            _CONTRACT_MISSES.pop(sym, None)
+    _CONTRACT_MISSES[symbol] = now
+
+
 def get_contract_id(symbol: str, live: bool = False) -> str:
     """
     Resolve Topstep contract ID by symbol with caching.
 
+    Hits are kept in a bounded LRU; symbols the API doesn't know are
+    remembered for CONTRACT_MISS_TTL_S so repeated bad alerts don't re-query.
+
     Args:
         symbol: Contract symbol (e.g., 'NQU5')
         live: Whether to search live contracts only
@@ -142,27 +315,34 @@ def get_contract_id(symbol: str, live: bool = False) -> str:
         ValueError: If no matching contract found
         requests.HTTPError: If API call fails
     """
+    # Check cache first (raw key hits skip normalization entirely)
+    cached = _contract_cache_get(symbol)
+    if cached:
+        return cached
+
+    raw = symbol
     symbol = symbol.upper().strip()
+    cached = _contract_cache_get(symbol)
+    if cached:
+        _contract_cache_put(raw, cached)
+        return cached
 
-    # Check cache first
-    if symbol in CONTRACT_ID_MAP:
-        return CONTRACT_ID_MAP[symbol]
+    missed_at = _CONTRACT_MISSES.get(symbol)
+    if missed_at is not None and time.monotonic() - missed_at < CONTRACT_MISS_TTL_S:
+        raise ValueError(f"❌ No matching contract for symbol: {symbol} (cached)")
 
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Contract/search",
-        json={"searchText": symbol, "live": live},
-        headers=_auth_header(),
-        timeout=config.http_timeout,
-    )
+    r = _post(_URLS.contract_search, {"searchText": symbol, "live": live})
     r.raise_for_status()
 
-    for c in r.json().get("contracts", []):
+    for c in _loads(r.content).get("contracts", []):
         if c.get("name", "").upper().startswith(symbol):
             contract_id = c["id"]
-            CONTRACT_ID_MAP[symbol] = contract_id
+            _contract_cache_put(symbol, contract_id)
+            _contract_cache_put(raw, contract_id)
             logging.info(f"✅ Contract {c['name']} → ID={contract_id}")
             return contract_id
 
+    _remember_contract_miss(symbol)
     raise ValueError(f"❌ No matching contract for symbol: {symbol}")
 
 
@@ -199,17 +379,11 @@ def place_limit_order(
         "size": size,
         "limitPrice": price,
     }
-    url = f"{config.topstep_api_base}/api/Order/place"
-
     try:
-        r = SESSION.post(
-            url,
-            json=payload,
-            headers=_auth_header(),
-            timeout=config.http_timeout
-        )
+        r = _post(_URLS.order_place, payload)
         r.raise_for_status()
-        order = r.json()
+        order = _loads(r.content)
+        _invalidate_open_orders(payload["accountId"])
         logging.info(f"📥 Limit placed: {order}")
         return order
 
@@ -248,20 +422,19 @@ def place_market_order(contract_id: str, side: int, size: int) -> Dict:
     Raises:
         requests.HTTPError: If API call fails
     """
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Order/place",
-        json={
+    r = _post(
+        _URLS.order_place,
+        {
             "accountId": get_account_id(),
             "contractId": contract_id,
             "type": 2,  # Market
             "side": side,
             "size": size,
         },
-        headers=_auth_header(),
-        timeout=config.http_timeout,
     )
     r.raise_for_status()
-    order = r.json()
+    order = _loads(r.content)
+    _invalidate_open_orders(get_account_id())
     logging.info(f"📥 Market placed: {order}")
     return order
 
@@ -291,9 +464,9 @@ def place_trailing_stop(
     Raises:
         requests.HTTPError: If API call fails
     """
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Order/place",
-        json={
+    r = _post(
+        _URLS.order_place,
+        {
             "accountId": account_id,
             "contractId": contract_id,
             "type": 5,  # Trailing Stop
@@ -301,11 +474,11 @@ def place_trailing_stop(
             "size": size,
             "trailPrice": trail_price,
         },
-        headers=_auth_header(token),
-        timeout=config.http_timeout,
+        token,
     )
     r.raise_for_status()
-    order = r.json()
+    order = _loads(r.content)
+    _invalidate_open_orders(account_id)
     logging.info(f"🛑 Trailing stop placed: {order}")
     return order
 
@@ -335,9 +508,9 @@ def place_stop_loss_order(
     Raises:
         requests.HTTPError: If API call fails
     """
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Order/place",
-        json={
+    r = _post(
+        _URLS.order_place,
+        {
             "accountId": account_id,
             "contractId": contract_id,
             "type": 4,  # Stop Market
@@ -345,11 +518,11 @@ def place_stop_loss_order(
             "size": size,
             "stopPrice": stop_price
         },
-        headers=_auth_header(token),
-        timeout=config.http_timeout,
+        token,
     )
     r.raise_for_status()
-    order = r.json()
+    order = _loads(r.content)
+    _invalidate_open_orders(account_id)
     logging.info(f"🛑 Static stop-loss placed: {order}")
     return order
 
@@ -370,14 +543,88 @@ def search_open_orders(token: str, account_id: int) -> List[Dict]:
     Raises:
         requests.HTTPError: If API call fails
     """
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Order/searchOpen",
-        json={"accountId": account_id},
-        headers=_auth_header(token),
-        timeout=config.http_timeout,
-    )
+    r = _post(_URLS.order_search_open, {"accountId": account_id}, token)
     r.raise_for_status()
-    return r.json().get("orders", [])
+    return _loads(r.content).get("orders", [])
+
+
+def _cid(o: Dict):
+    """Contract ID of an order/position dict (flat or nested form), without a per-call {} default"""
+    c = o.get("contractId")
+    return c if c else (o.get("contract") or {}).get("id")
+
+
+def _oid(o: Dict):
+    """Order ID of an order dict"""
+    return o.get("id") or o.get("orderId")
+
+
+def search_open_orders_cached(token: str, account_id: int, ttl: float = 1.0) -> List[Dict]:
+    """
+    Return open orders, reusing a snapshot fetched within the last `ttl` seconds.
+
+    Order placement through this module invalidates the snapshot, and a fetch
+    that was already in flight when that happened is returned to its caller
+    but not cached, so the snapshot is only ever stale with respect to orders
+    placed elsewhere.
+
+    Args:
+        token: Authentication token
+        account_id: Account ID
+        ttl: Maximum snapshot age in seconds
+
+    Returns:
+        List of order dicts
+
+    Raises:
+        requests.HTTPError: If API call fails
+    """
+    hit = _open_orders_cache.get(account_id)
+    if hit and time.monotonic() - hit[0] < ttl:
+        return hit[1]
+
+    with _open_orders_lock:
+        gen = _open_orders_gen.get(account_id, 0)
+    started = time.monotonic()
+    orders = search_open_orders(token, account_id)
+    with _open_orders_lock:
+        if _open_orders_gen.get(account_id, 0) == gen:
+            _open_orders_cache[account_id] = (started, orders)
+    return orders
+
+
+def search_open_orders_indexed(token: str, account_id: int, ttl: float = 0.4) -> Dict[Any, Dict]:
+    """
+    Open orders keyed by order ID, built once per shared snapshot.
+
+    Watchers on the same account share both the REST call and the index, so
+    checking one order is a dict lookup rather than a scan per caller.
+
+    Args:
+        token: Authentication token
+        account_id: Account ID
+        ttl: Maximum snapshot age in seconds
+
+    Returns:
+        Dict mapping order ID to order dict
+
+    Raises:
+        requests.HTTPError: If API call fails
+    """
+    orders = search_open_orders_cached(token, account_id, ttl)
+    hit = _open_orders_index.get(account_id)
+    if hit and hit[0] is orders:
+        return hit[1]
+    index = {_oid(o): o for o in orders}
+    _open_orders_index[account_id] = (orders, index)
+    return index
+
+
+def _invalidate_open_orders(account_id: int):
+    """Drop the cached open-orders snapshot for an account and void in-flight fetches."""
+    with _open_orders_lock:
+        _open_orders_gen[account_id] = _open_orders_gen.get(account_id, 0) + 1
+        _open_orders_cache.pop(account_id, None)
 
 
 def cancel_order(token: str, account_id: int, order_id: str):
@@ -392,16 +639,96 @@ def cancel_order(token: str, account_id: int, order_id: str):
     Raises:
         requests.HTTPError: If API call fails
     """
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Order/cancel",
-        json={"accountId": account_id, "orderId": order_id},
-        headers=_auth_header(token),
-        timeout=config.http_timeout,
-    )
+    r = _post(_URLS.order_cancel, {"accountId": account_id, "orderId": order_id}, token)
     r.raise_for_status()
     logging.info(f"❌ Order canceled: {order_id}")
 
 
+def cancel_orders(
+        token: str,
+        account_id: int,
+        order_ids: List[str],
+        label: str = "Cancel"
+) -> List[str]:
+    """
+    Cancel several orders concurrently over the shared session pool.
+
+    Each cancel is isolated so one failed request doesn't abort the batch.
+
+    Args:
+        token: Authentication token
+        account_id: Account ID
+        order_ids: Order IDs to cancel
+        label: Prefix for failure log lines
+
+    Returns:
+        List of order IDs that were canceled successfully
+    """
+    if not order_ids:
+        return []
+
+    def _cancel(oid) -> bool:
+        try:
+            cancel_order(token, account_id, oid)
+            return True
+        except Exception:
+            logging.exception("%s failed for order %s", label, oid)
+            return False
+
+    if len(order_ids) == 1:
+        results = [_cancel(order_ids[0])]
+    else:
+        results = list(_CANCEL_POOL.map(_cancel, order_ids))
+
+    return [oid for oid, ok in zip(order_ids, results) if ok]
+
+
+def cancel_for_contract(
+        token: str,
+        account_id: int,
+        contract_id: str,
+        type_filter: Optional[Tuple] = None,
+        orders: Optional[List[Dict]] = None,
+        label: str = "Cancel"
+) -> List[str]:
+    """
+    Cancel open orders for a contract, optionally restricted to order types.
+
+    Args:
+        token: Authentication token
+        account_id: Account ID
+        contract_id: Contract ID to cancel orders for
+        type_filter: Order type values to cancel (None = all types)
+        orders: Already-fetched open orders (fetched via the short-lived cache if omitted)
+        label: Prefix for failure log lines
+
+    Returns:
+        List of canceled order IDs
+    """
+    if orders is None:
+        orders = search_open_orders_cached(token, account_id)
+
+    contract_key = str(contract_id)
+    matches = [o for o in orders if str(_cid(o)) == contract_key]
+    if type_filter is not None:
+        matches = [o for o in matches if (o.get("type") or o.get("orderType")) in type_filter]
+    targets = [oid for oid in (_oid(o) for o in matches) if oid]
+
+    canceled_ids = cancel_orders(token, account_id, targets, label)
+
+    # Keep the shared snapshot consistent for the next filter that reads it
+    if canceled_ids:
+        gone = set(canceled_ids)
+        with _open_orders_lock:
+            hit = _open_orders_cache.get(account_id)
+            if hit:
+                _open_orders_cache[account_id] = (
+                    hit[0], [o for o in hit[1] if _oid(o) not in gone]
+                )
+
+    return canceled_ids
+
+
 def cancel_open_orders_for_contract(
         token: str,
         account_id: int,
@@ -418,24 +745,7 @@ def cancel_open_orders_for_contract(
     Returns:
         Tuple of (count of canceled orders, list of canceled order IDs)
     """
-    orders = search_open_orders(token, account_id)
-    canceled_ids = []
-
-    for o in orders:
-        cid = o.get("contractId") or o.get("contract", {}).get("id")
-        if cid != contract_id:
-            continue
-
-        oid = o.get("id") or o.get("orderId")
-        if not oid:
-            continue
-
-        try:
-            cancel_order(token, account_id, oid)
-            canceled_ids.append(oid)
-        except Exception:
-            logging.exception("Cancel failed for order %s", oid)
-
+    canceled_ids = cancel_for_contract(token, account_id, contract_id, label="Cancel")
     return len(canceled_ids), canceled_ids
 
 
@@ -446,25 +756,12 @@ def cancel_trailing_stops_for_contract(token: str, account_id: int, contract_id:
     Returns:
         Tuple of (count_canceled, list_of_order_ids)
     """
-    orders = search_open_orders(token, account_id)
-    canceled_ids = []
-
-    for o in orders:
-        cid = o.get("contractId") or o.get("contract", {}).get("id")
-        if cid != contract_id:
-            continue
-
-        # Check if it's a trailing stop order (adjust field name based on your API)
-        order_type = o.get("type") or o.get("orderType")
-        if order_type in ("TrailingStop", "TRAILING_STOP", 5):  # Adjust based on your API's type values
-            oid = o.get("id") or o.get("orderId")
-            if oid:
-                try:
-                    cancel_order(token, account_id, oid)
-                    canceled_ids.append(oid)
-                except Exception:
-                    logging.exception("Failed to cancel trailing stop order %s", oid)
-
+    # Adjust type values based on your API's trailing stop representation
+    canceled_ids = cancel_for_contract(
+        token, account_id, contract_id,
+        type_filter=("TrailingStop", "TRAILING_STOP", 5),
+        label="Cancel TRAILING-STOP"
+    )
     logging.info("🧹 Canceled %d trailing stop order(s) for %s: %s", len(canceled_ids), contract_id, canceled_ids)
     return len(canceled_ids), canceled_ids
 
@@ -484,27 +781,11 @@ def cancel_stop_markets_for_contract(
     Returns:
         Tuple of (count of canceled orders, list of canceled order IDs)
     """
-    orders = search_open_orders(token, account_id)
-    canceled_ids = []
-
-    for o in orders:
-        cid = o.get("contractId") or o.get("contract", {}).get("id")
-        if str(cid) != str(contract_id):
-            continue
-
-        if o.get("type") != 4:  # Only Stop Market
-            continue
-
-        oid = o.get("id") or o.get("orderId")
-        if not oid:
-            continue
-
-        try:
-            cancel_order(token, account_id, oid)
-            canceled_ids.append(oid)
-        except Exception:
-            logging.exception("Cancel STOP-MARKET failed for order %s", oid)
-
+    canceled_ids = cancel_for_contract(
+        token, account_id, contract_id,
+        type_filter=(4,),  # Only Stop Market
+        label="Cancel STOP-MARKET"
+    )
     logging.info(
         "🧹 Canceled %d Stop Market order(s) for %s: %s",
         len(canceled_ids), contract_id, canceled_ids
@@ -528,15 +809,9 @@ def get_open_positions(token: str, account_id: int) -> List[Dict]:
     Raises:
         requests.HTTPError: If API call fails
     """
-    r = SESSION.post(
-        f"{config.topstep_api_base}/api/Position/searchOpen",
-        json={"accountId": account_id},
-        headers=_auth_header(token),
-        timeout=config.http_timeout,
-    )
+    r = _post(_URLS.position_search_open, {"accountId": account_id}, token)
     r.raise_for_status()
-    payload = r.json()
-    print(payload)
+    payload = _loads(r.content)
     positions = payload.get("positions", payload if isinstance(payload, list) else [])
     return positions if isinstance(positions, list) else []
 
@@ -579,8 +854,7 @@ def get_net_position_for_contract(
         Net position quantity (0 if no position)
     """
     for p in get_open_positions(token, account_id):
-        cid = p.get("contractId") or p.get("contract", {}).get("id")
-        if cid == contract_id:
+        if _cid(p) == contract_id:
             return _extract_net_qty(p)
     return 0
 
@@ -607,12 +881,7 @@ def close_position_contract(
         requests.HTTPError: If API call fails and not tolerated
     """
     try:
-        r = SESSION.post(
-            f"{config.topstep_api_base}/api/Position/closeContract",
-            json={"accountId": account_id, "contractId": contract_id},
-            headers=_auth_header(token),
-            timeout=config.http_timeout,
-        )
+        r = _post(_URLS.position_close_contract, {"accountId": account_id, "contractId": contract_id}, token)
 
         if r.status_code >= 400:
             # Some servers 400/404 when already flat
@@ -626,7 +895,7 @@ def close_position_contract(
         else:
             logging.info("✅ closeContract accepted for %s", contract_id)
 
-        return r.json() if r.content else {}
+        return _loads(r.content) if r.content else {}
 
     except requests.HTTPError:  # ✅ FIXED
         if tolerate_no_position:
@@ -640,25 +909,34 @@ def wait_until_flat(
         account_id: int,
         contract_id: str,
         timeout_s: float = 3.0,
-        poll_ms: int = 200
+        poll_ms: int = 50,
+        max_poll_ms: int = 400,
+        position_event: Optional[threading.Event] = None
 ) -> Tuple[bool, int]:
     """
-    Poll position until net == 0 or timeout.
+    Poll position until net == 0 or timeout, backing off exponentially.
+
+    Delays run poll_ms, 2*poll_ms, 4*poll_ms ... capped at max_poll_ms. If a
+    position_event is supplied (set by a position push feed), waiting on it
+    replaces the sleep so a position update triggers an immediate re-check.
 
     Args:
         token: Authentication token
         account_id: Account ID
         contract_id: Contract ID to monitor
         timeout_s: Timeout in seconds
-        poll_ms: Polling interval in milliseconds
+        poll_ms: Initial polling interval in milliseconds
+        max_poll_ms: Upper bound for the polling interval in milliseconds
+        position_event: Optional event set whenever a position update arrives
 
     Returns:
         Tuple of (is_flat: bool, last_net: int)
     """
-    deadline = time.time() + timeout_s
+    deadline = time.monotonic() + timeout_s
     last_net = None
+    attempt = 0
 
-    while time.time() < deadline:
+    while True:
         try:
             last_net = get_net_position_for_contract(token, account_id, contract_id)
         except Exception:
@@ -668,26 +946,37 @@ def wait_until_flat(
         if last_net == 0:
             return True, 0
 
-        time.sleep(poll_ms / 1000.0)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        delay = min(max_poll_ms, poll_ms * (2 ** attempt)) / 1000.0
+        attempt += 1
+        delay = min(delay, remaining)
+
+        if position_event is not None:
+            if position_event.wait(timeout=delay):
+                position_event.clear()
+        else:
+            time.sleep(delay)
 
     return False, (last_net or 0)
 
 
 # ── Helper Functions ───────────────────────────────────────────────────────────
 
-def _orders_equal_price(a: float, b: float, tick: float = 0.25) -> bool:
+def _price_ticks(price: float, tick: float = 0.25) -> int:
     """
-    Check if two prices are equal within half-tick tolerance.
+    Convert a price to an integer number of ticks.
 
     Args:
-        a: First price
-        b: Second price
+        price: Price to convert
         tick: Tick size (default 0.25)
 
     Returns:
-        True if prices are within half-tick of each other
+        Price expressed in whole ticks (nearest)
     """
-    return abs(a - b) <= (tick / 2.0)
+    return int(round(price / tick))
 
 
 def _reconcile_limit_order(
@@ -718,32 +1007,24 @@ def _reconcile_limit_order(
         logging.exception("Reconcile: search_open_orders failed")
         return None
 
+    # Index by (contract, type, side, size, price-in-ticks) for a single lookup;
+    # integer ticks compare exactly, replacing the half-tick float tolerance.
+    tick = config.tick_size
+    idx = {}
     for o in orders:
-        # Check contract
-        if (o.get("contractId") or o.get("contract", {}).get("id")) != contract_id:
-            continue
-
-        # Check type (must be Limit)
-        if int(o.get("type")) != 1:
-            continue
-
-        # Check side
-        if int(o.get("side")) != int(side):
-            continue
-
-        # Check size
-        if int(o.get("size")) != int(size):
-            continue
-
-        # Check price (within tolerance)
-        lp = o.get("limitPrice") or o.get("price") or 0.0
         try:
-            lp = float(lp)
+            key = (
+                _cid(o),
+                int(o.get("type")),
+                int(o.get("side")),
+                int(o.get("size")),
+                _price_ticks(float(o.get("limitPrice") or o.get("price") or 0.0), tick),
+            )
         except Exception:
             continue
+        idx.setdefault(key, o)
 
-        if _orders_equal_price(lp, float(price)):
-            logging.info("🔎 Reconcile: matched live LIMIT order after timeout → %s", o)
-            return o
-
-    return None
\ No newline at end of file
+    o = idx.get((contract_id, 1, int(side), int(size), _price_ticks(float(price), tick)))
+    if o is not None:
+        logging.info("🔎 Reconcile: matched live LIMIT order after timeout → %s", o)
+    return o
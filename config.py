@@ -2,11 +2,11 @@
 """Centralized configuration for trading bot"""
 import os
 import threading
-import pytz
-from collections import defaultdict
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from utils import EST
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -19,6 +19,7 @@ class TradingConfig:
         self.topstep_api_base = "https://api.topstepx.com"
         self.topstep_username = os.getenv("TOPSTEP_USERNAME")
         self.topstep_api_key = os.getenv("TOPSTEP_API_KEY")
+        self.account_name = os.getenv("TOPSTEP_ACCOUNT_NAME")  # Required if several accounts can trade; else the only tradable one
 
         # Trading Configuration
         self.default_contract_symbol = "MNQZ5"
@@ -26,19 +27,25 @@ class TradingConfig:
 
         # Timing Configuration
         self.close_holdoff_ms = 1500  # Milliseconds to wait after close before accepting new entries
-        self.auth_refresh_hours = 2  # Hours between token refreshes
+        self.auth_refresh_hours = 2  # Max hours between token expiry checks
+        self.token_refresh_margin_ms = 10 * 60 * 1000  # Refresh once the token is this close to expiry
 
         # Timezone
-        self.timezone = pytz.timezone("America/New_York")
+        self.timezone = EST
 
         # Runtime State (set during initialization)
         self.topstep_token: Optional[str] = None
+        self.token_expiry_ms: int = 0
+        self.token_lock = threading.RLock()  # Serializes refreshes; readers use the reference lock-free
         self.account_id: Optional[int] = None
         self.contract_id: Optional[str] = None
         self.quote_bus = None
+        self.order_bus = None
 
         # Per-symbol state management
-        self.per_symbol_lock: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        # Striped locks: fixed pool indexed by symbol hash (bounded, no lazy creation race)
+        self.symbol_lock_stripes = 64  # must be a power of two
+        self._symbol_locks: List[threading.Lock] = [threading.Lock() for _ in range(self.symbol_lock_stripes)]
         self.close_holdoff_until_ms: Dict[str, int] = {}
         self.last_close_ts_ms: Dict[str, int] = {}
 
@@ -54,6 +61,10 @@ class TradingConfig:
         self.flask_port = 5000
         self.flask_debug = False
 
+    def lock_for(self, symbol: str) -> threading.Lock:
+        """Return the lock guarding order flow for a symbol/contract ID"""
+        return self._symbol_locks[hash(symbol) & (self.symbol_lock_stripes - 1)]
+
     def validate(self):
         """Validate that all required configuration is present"""
         if not self.topstep_username:
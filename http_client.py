@@ -0,0 +1,73 @@
+# http_client.py
+"""Shared pooled HTTP session for broker and local (ngrok) calls"""
+import random
+import socket
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import config
+
+NGROK_API_BASE = "http://127.0.0.1:4040"
+
+
+class _JitteredRetry(Retry):
+    """Retry whose backoff gets up to +30% random jitter so clients don't retry in lockstep"""
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, backoff * 0.3) if backoff > 0 else backoff
+
+
+class _IPv4Adapter(HTTPAdapter):
+    """
+    HTTPAdapter that connects over IPv4 only, with Nagle disabled and TCP keepalive on.
+
+    Binding the source address to 0.0.0.0 makes urllib3 skip AAAA results
+    for this pool, so the IPv4 pin stays scoped to the host it's mounted on.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = [
+            (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        kwargs["source_address"] = ("0.0.0.0", 0)
+        super().init_poolmanager(*args, **kwargs)
+
+
+# Shared resilient HTTP session
+def _make_session() -> requests.Session:
+    """Create a requests session with retry logic and connection pooling"""
+    s = requests.Session()
+    retry = _JitteredRetry(
+        total=config.http_retry_total,
+        connect=config.http_retry_connect,
+        read=config.http_retry_read,
+        backoff_factor=config.http_backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "POST", "PUT", "DELETE", "PATCH"),
+        respect_retry_after_header=True  # 429/503 Retry-After overrides our schedule
+    )
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=10,
+        pool_maxsize=20,
+        pool_block=True
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+
+    # Local ngrok agent API: callers poll it themselves, so no urllib3 retries
+    s.mount(NGROK_API_BASE, HTTPAdapter(max_retries=0, pool_connections=1, pool_maxsize=2))
+
+    # TopstepX only: force IPv4 (other hosts keep the system's address selection)
+    s.mount(config.topstep_api_base, _IPv4Adapter(
+        max_retries=retry,
+        pool_connections=10,
+        pool_maxsize=20,
+        pool_block=True
+    ))
+    return s
+
+
+SESSION = _make_session()
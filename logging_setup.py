@@ -1,6 +1,9 @@
 # logging_setup.py
 import logging, sys
 
+# File-log selectors: one C-level startswith(tuple), then inlined substring checks below
+_PREFIXES = ("📩 Webhook received", "📥 Limit order placed", "⏱", "🔁", "❌", "▶")
+
 def setup_logging(log_filename="trading.log"):
     root = logging.getLogger()
     if getattr(root, "_is_setup", False):
@@ -20,17 +23,8 @@ def setup_logging(log_filename="trading.log"):
     class TradeFilter(logging.Filter):
         def filter(self, record):
             msg = record.getMessage()
-            return (
-                msg.startswith("📩 Webhook received")
-                or msg.startswith("📥 Limit order placed")
-                or msg.startswith("⏱")
-                or msg.startswith("🔁")
-                or msg.startswith("❌")
-                or msg.startswith("▶")
-                or "📥 Entry@" in msg
-                or "🎯 Trigger hit" in msg
-                or "never filled" in msg
-            )
+            return (msg.startswith(_PREFIXES) or "📥 Entry@" in msg
+                    or "🎯 Trigger hit" in msg or "never filled" in msg)
 
     fh = logging.FileHandler(log_filename, mode="a", encoding="utf-8")
     fh.setLevel(logging.INFO)
@@ -1,48 +1,98 @@
 # ngrok_helper.py
 import requests
 import logging
+import os
 import time
+from pathlib import Path
+from http_client import SESSION, NGROK_API_BASE
+from utils import backoff_delay
 
 
-def get_ngrok_url(max_retries=10, delay=1):
+_URL_CACHE_PATH = Path.home() / ".cache" / "tradingbot" / "ngrok_url"
+_URL_CACHE_TTL_S = 60
+
+
+def _read_cached_url(domain):
+    """Return the cached ngrok URL if it is for `domain` and was written less than _URL_CACHE_TTL_S ago"""
+    try:
+        if time.time() - _URL_CACHE_PATH.stat().st_mtime < _URL_CACHE_TTL_S:
+            url = _URL_CACHE_PATH.read_text(encoding="utf-8").strip()
+            if url == f"https://{domain}":
+                return url
+    except OSError:
+        pass
+    return None
+
+
+def _write_cached_url(url):
+    try:
+        _URL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _URL_CACHE_PATH.write_text(url, encoding="utf-8")
+    except OSError:
+        logging.debug("Could not cache ngrok URL", exc_info=True)
+
+
+def _tunnel_url(tunnels):
+    """Pick the public https URL from an /api/tunnels listing"""
+    for tunnel in tunnels:
+        if tunnel.get("proto") == "https":
+            return tunnel.get("public_url")
+
+    # If no https tunnel, try http
+    for tunnel in tunnels:
+        if tunnel.get("proto") == "http":
+            return tunnel.get("public_url").replace("http://", "https://")
+
+    return None
+
+
+def get_ngrok_url(max_retries=15, delay=0.1, max_delay=2.0, use_cache=True):
     """
     Fetch the public ngrok URL from the local ngrok API.
 
+    Polls with fully-jittered exponential backoff (up to delay, 2*delay, ...
+    capped at max_delay). With a static NGROK_DOMAIN, a URL fetched within
+    the last minute by a previous run is reused; without one every ngrok
+    start gets a new random URL, so the cache is skipped.
+
     Args:
         max_retries: Number of times to retry
-        delay: Seconds to wait between retries
+        delay: Backoff scale for the first retry (seconds)
+        max_delay: Upper bound for the wait between retries
+        use_cache: Whether to read/write the short-lived on-disk URL cache (static domains only)
 
     Returns:
         ngrok public URL or None
     """
+    domain = os.getenv("NGROK_DOMAIN", "").strip()
+    use_cache = use_cache and bool(domain)
+    if use_cache:
+        cached = _read_cached_url(domain)
+        if cached:
+            return cached
+
     for attempt in range(max_retries):
         try:
-            response = requests.get("http://127.0.0.1:4040/api/tunnels", timeout=2)
+            response = SESSION.get(f"{NGROK_API_BASE}/api/tunnels", timeout=2)
             if response.status_code == 200:
-                data = response.json()
-                tunnels = data.get("tunnels", [])
-
-                for tunnel in tunnels:
-                    if tunnel.get("proto") == "https":
-                        public_url = tunnel.get("public_url")
-                        return public_url
-
-                # If no https tunnel, try http
-                for tunnel in tunnels:
-                    if tunnel.get("proto") == "http":
-                        public_url = tunnel.get("public_url")
-                        return public_url.replace("http://", "https://")
+                public_url = _tunnel_url(response.json().get("tunnels", []))
+                if public_url:
+                    if use_cache:
+                        _write_cached_url(public_url)
+                    return public_url
 
         except requests.exceptions.ConnectionError:
             if attempt < max_retries - 1:
                 logging.info(f"⏳ Waiting for ngrok to start... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(delay)
             else:
                 logging.error("❌ Could not connect to ngrok API. Is ngrok running?")
 
         except Exception as e:
             logging.error(f"❌ Error fetching ngrok URL: {e}")
 
+        if attempt < max_retries - 1:
+            time.sleep(backoff_delay(attempt, delay, max_delay))
+
     return None
 
 
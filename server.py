@@ -1,19 +1,36 @@
 # server.py
+import calendar
 import logging
 import threading
-import pytz
 import re
 import requests
 import subprocess
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from flask import Flask, request, jsonify
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 from datetime import datetime as _dt
 from dotenv import load_dotenv
 from logging_setup import setup_logging
+from ngrok_helper import display_ngrok_url
 from config import config
-from utils import round_half_up, round_to_tick, within_market_hours, is_trading_paused, now_ms
+
+try:
+    from orjson import loads as _loads
+except ImportError:  # stdlib fallback
+    from json import loads as _loads
+
+from utils import (
+    round_half_up,
+    round_to_tick,
+    within_market_hours,
+    is_trading_paused,
+    now_ms,
+    backoff_delay,
+    seconds_until_pause_edge,
+)
 from api import (
     authenticate_topstepx,
     get_account_id,
@@ -24,12 +41,17 @@ from api import (
     get_net_position_for_contract,
     close_position_contract,
     search_open_orders,
-    cancel_order,
     wait_until_flat,
-    cancel_stop_markets_for_contract, cancel_trailing_stops_for_contract
+    cancel_stop_markets_for_contract, cancel_trailing_stops_for_contract,
+    submit,
+    start_keepalive,
+    prewarm_connection,
+    cancel_for_contract,
+    cancel_orders
 )
 from topstep_ws import (
     QuoteBus,
+    OrderBus,
     watch_trigger_and_place_trailer,
     cancel_trailing_watchers,
 )
@@ -41,6 +63,10 @@ load_dotenv()
 setup_logging()
 app = Flask(__name__)
 
+# Bounded pool for short-lived background work (post-close quarantine, ngrok URL display).
+# Long-lived loops (auth refresher, QuoteBus guard) keep dedicated threads.
+_BG = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bg")
+
 
 # ── ngrok Integration ──────────────────────────────────────────────────────────
 def start_ngrok():
@@ -84,97 +110,27 @@ def start_ngrok():
         return None
 
 
-def get_ngrok_url(max_retries=15, delay=1):
-    """
-    Fetch the public ngrok URL from the local ngrok API.
-
-    Args:
-        max_retries: Number of times to retry
-        delay: Seconds to wait between retries
-
-    Returns:
-        ngrok public URL or None
-    """
-    for attempt in range(max_retries):
-        try:
-            response = requests.get("http://127.0.0.1:4040/api/tunnels", timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                tunnels = data.get("tunnels", [])
-
-                for tunnel in tunnels:
-                    if tunnel.get("proto") == "https":
-                        public_url = tunnel.get("public_url")
-                        return public_url
-
-                # If no https tunnel, try http
-                for tunnel in tunnels:
-                    if tunnel.get("proto") == "http":
-                        public_url = tunnel.get("public_url")
-                        return public_url.replace("http://", "https://")
-
-        except requests.exceptions.ConnectionError:
-            if attempt < max_retries - 1:
-                logging.info(f"Waiting for ngrok to start... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(delay)
-            else:
-                logging.error("Could not connect to ngrok API after all retries")
-
-        except Exception as e:
-            logging.error(f"Error fetching ngrok URL: {e}")
-
-    return None
-
-
-def display_ngrok_url():
-    """Fetch and display the ngrok URL with instructions"""
-    ngrok_url = get_ngrok_url()
-
-    if ngrok_url:
-        webhook_url = f"{ngrok_url}/webhook"
-
-        print("\n" + "=" * 70)
-        print("NGROK TUNNEL ACTIVE")
-        print("=" * 70)
-        print(f"Public URL: {ngrok_url}")
-        print(f"Webhook URL: {webhook_url}")
-        print("\n📋 COPY THIS URL TO TRADINGVIEW:")
-        print(f"   {webhook_url}")
-        print("\nngrok Dashboard: http://127.0.0.1:4040")
-        print("=" * 70 + "\n")
-
-        logging.info(f"✅ ngrok tunnel established: {ngrok_url}")
-        return webhook_url
-    else:
-        print("\n" + "=" * 70)
-        print("WARNING: Could not fetch ngrok URL")
-        print("=" * 70)
-        print("Please check:")
-        print("  1. Is ngrok running?")
-        print("  2. Visit: http://127.0.0.1:4040 to see the URL manually")
-        print("=" * 70 + "\n")
-
-        logging.warning("⚠Could not fetch ngrok URL automatically")
-        return None
-
 # ── Contract rolling logic ─────────────────────────────────────────────────────
 _MONTH_CODE = {3:"H", 6:"M", 9:"U", 12:"Z"}
 
 def _current_quarter_month(d: _dt) -> int:
     return (( (d.month - 1) // 3 ) + 1) * 3
 
+@lru_cache(maxsize=32)
 def _third_friday(year:int, month:int) -> _dt:
-    import calendar
     cal = calendar.monthcalendar(year, month)
     day = [wk[calendar.FRIDAY] for wk in cal if wk[calendar.FRIDAY] != 0][2]
     return _dt(year, month, day, 0, 0, 0)
 
+@lru_cache(maxsize=32)
 def _roll_start(year:int, month:int) -> _dt:
     # start rolling ~8 trading days before 3rd Friday (approx 11 calendar days)
     return _third_friday(year, month) - timedelta(days=11)
 
-def map_continuous_to_active_quarter(root: str = "NQ", now: _dt | None = None) -> str:
-    now = now or _dt.utcnow()
+@lru_cache(maxsize=32)
+def _active_quarter_symbol(root: str, day: date) -> str:
+    # roll boundaries fall on midnight, so the active symbol only changes per calendar day
+    now = _dt(day.year, day.month, day.day)
     qm = _current_quarter_month(now)
     code = _MONTH_CODE[qm]
     yy = (now.year % 10)
@@ -188,40 +144,97 @@ def map_continuous_to_active_quarter(root: str = "NQ", now: _dt | None = None) -
 
     return f"{root}{code}{yy}"
 
+def map_continuous_to_active_quarter(root: str = "NQ", now: _dt | None = None) -> str:
+    now = now or _dt.utcnow()
+    return _active_quarter_symbol(root, now.date())
+
+# Set by bus disconnect callbacks so the guard reacts at once instead of polling
+_guard_wake = threading.Event()
+GUARD_MAX_SLEEP_S = 15 * 60
+
+def _new_quote_bus(contract_id: str) -> 'QuoteBus':
+    bus = QuoteBus(config.topstep_token, contract_id)
+    bus.on_disconnect = _guard_wake.set
+    return bus
+
 def _quote_bus_guard():
     """Keeps QuoteBus stopped 4–6pm ET; otherwise ensures it's connected.
-       Also restarts on any disconnect and pushes refreshed tokens."""
+       Also restarts on any disconnect and pushes refreshed tokens.
+       Sleeps until the next pause edge or a bus disconnect (stale feeds are QuoteBus's own watchdog).
+       Consecutive restarts back off exponentially; the count resets once everything is connected."""
+    failures = 0
     while True:
+        paused = False
+        restarted = False
         try:
-            if is_trading_paused():
+            paused = is_trading_paused()
+            if paused:
                 if config.quote_bus and config.quote_bus.is_connected():
                     logging.info("⏸️ CME pause → stopping QuoteBus")
                     config.quote_bus.stop()
             else:
                 if config.quote_bus is None:
-                    config.quote_bus = QuoteBus(config.topstep_token, config.contract_id)
+                    config.quote_bus = _new_quote_bus(config.contract_id)
                 config.quote_bus.set_token(config.topstep_token)
                 if not config.quote_bus.is_connected():
                     logging.info("🔁 Guard: (re)starting QuoteBus for %s", config.contract_id)
+                    restarted = True
                     config.quote_bus.start()
-                # if connected but no ticks for 30s during hours, resubscribe by restart
-                now_ms_val = now_ms()
-                if config.quote_bus.is_connected() and (now_ms_val - config.quote_bus.last_tick_ms) > 30000:
-                    logging.warning("🩺 No ticks in 30s → restarting QuoteBus")
-                    config.quote_bus.stop()
-                    config.quote_bus.start()
+            if config.order_bus is not None:
+                config.order_bus.set_token(config.topstep_token)
+                if not config.order_bus.is_connected():
+                    logging.info("🔁 Guard: (re)starting OrderBus for account %s", config.account_id)
+                    restarted = True
+                    config.order_bus.start()
         except Exception:
             logging.exception("QuoteBus guard error")
-        time.sleep(5)
+
+        if restarted:
+            # give the (re)start time to connect; sleep rather than wait on _guard_wake, since a hub
+            # that fails fast (DNS, 401, refused) fires on_close at once and would skip this floor
+            delay = 5.0 + backoff_delay(failures, base=5.0, cap=300.0)
+            failures += 1
+            time.sleep(min(delay, max(5.0, seconds_until_pause_edge() + 0.5)))
+            _guard_wake.clear()
+            continue
+        failures = 0
+
+        wait_s = seconds_until_pause_edge() + 0.5
+        qb = config.quote_bus
+        if not paused and qb is not None and not qb.is_connected():
+            wait_s = min(wait_s, 5.0)  # a guard error left it down
+        if config.order_bus is not None and not config.order_bus.is_connected():
+            wait_s = min(wait_s, 5.0)
+        _guard_wake.wait(min(max(wait_s, 1.0), GUARD_MAX_SLEEP_S))
+        _guard_wake.clear()
+
+def _refresh_token_if_expiring() -> bool:
+    """Re-authenticate if the token is within the refresh margin of expiry. Returns True if refreshed."""
+    with config.token_lock:
+        if now_ms() < config.token_expiry_ms - config.token_refresh_margin_ms:
+            return False
+        authenticate_topstepx()
+    for bus in (config.quote_bus, config.order_bus):
+        if bus is not None:
+            bus.set_token(config.topstep_token)
+    return True
 
 def auth_refresher(interval_hours=2):
+    failures = 0
     while True:
         try:
-            config.topstep_token = authenticate_topstepx()
-            logging.info("🔄 Token refreshed.")
+            if _refresh_token_if_expiring():
+                logging.info("🔄 Token refreshed.")
+            failures = 0
         except Exception:
             logging.exception("Auth refresh failed")
-        time.sleep(interval_hours * 3600)
+            # retry soon (jittered) instead of waiting a full interval on a stale token
+            time.sleep(backoff_delay(failures, base=5.0, cap=300.0))
+            failures += 1
+            continue
+        # sleep until the token enters its refresh margin (re-checking at least every interval)
+        until_refresh_s = (config.token_expiry_ms - config.token_refresh_margin_ms - now_ms()) / 1000.0
+        time.sleep(max(1.0, min(interval_hours * 3600, until_refresh_s)))
 
 # ── TradingView parser ─────────────────────────────────────────────────────────
 TV_RE = re.compile(
@@ -236,8 +249,16 @@ TV_RE = re.compile(
     re.IGNORECASE | re.VERBOSE,
 )
 
+# stop loss / atr / ts in one pass over the comment (first occurrence of each wins)
+COMMENT_RE = re.compile(
+    r"stop\s*loss\s*=\s*(?P<sl>[-+]?\d+(?:\.\d+)?)"
+    r"|atr\s*=\s*(?P<atr>[0-9]+(?:\.[0-9]+)?)"
+    r"|ts\s*=\s*(?P<ts>\d{10,13})",
+    re.IGNORECASE,
+)
+
 def parse_tv_alert(body_text: str):
-    m = TV_RE.search(body_text or "")
+    m = TV_RE.match(body_text or "")
     if not m:
         raise ValueError("Alert text did not match expected format.")
 
@@ -246,23 +267,19 @@ def parse_tv_alert(body_text: str):
     ticker    = m.group("ticker").strip()
     entry     = float(m.group("entry"))
     comment   = m.group("comment").strip()
-    stop_loss = None
-    msl = re.search(r"stop\s*loss\s*=\s*([-+]?\d+(?:\.\d+)?)", comment, flags=re.IGNORECASE)
-    if msl:
-        stop_loss = float(msl.group(1))
-
-    atr = None
-    m2 = re.search(r"atr\s*=\s*([0-9]+(?:\.[0-9]+)?)", comment, flags=re.IGNORECASE)
-    if m2:
-        atr = float(m2.group(1))
-
-    # optional |ts= in comment (ms or s)
-    ts_ms = None
-    m3 = re.search(r"ts\s*=\s*(\d{10,13})", comment, flags=re.IGNORECASE)
-    if m3:
-        ts_ms = int(m3.group(1))
-        if len(m3.group(1)) == 10:  # seconds → ms
-            ts_ms *= 1000
+    stop_loss = atr = ts_ms = None
+    for mc in COMMENT_RE.finditer(comment):
+        if mc.group("sl") is not None:
+            if stop_loss is None:
+                stop_loss = float(mc.group("sl"))
+        elif mc.group("atr") is not None:
+            if atr is None:
+                atr = float(mc.group("atr"))
+        elif ts_ms is None:
+            # optional |ts= in comment (ms or s)
+            ts_ms = int(mc.group("ts"))
+            if len(mc.group("ts")) == 10:  # seconds → ms
+                ts_ms *= 1000
 
     return {
         "direction": direction,
@@ -275,7 +292,15 @@ def parse_tv_alert(body_text: str):
         "stopLoss": stop_loss
     }
 
+# ticker text → (contract_id, UTC day it was resolved); the active quarter only rolls at midnight
+_RESOLVED_CONTRACTS: dict = {}
+
 def resolve_contract_for_ticker(ticker_text: str) -> str:
+    today = date(*time.gmtime()[:3])
+    hit = _RESOLVED_CONTRACTS.get(ticker_text)
+    if hit is not None and hit[1] == today:
+        return hit[0]
+
     try_symbol = ticker_text.upper().strip()
     # Translate continuous/root to an active quarterly symbol before calling the API
     if try_symbol in ("NQ1!", "NQ", "NQMAIN"):
@@ -283,42 +308,123 @@ def resolve_contract_for_ticker(ticker_text: str) -> str:
         logging.info("Mapped %s → %s (active)", try_symbol, mapped)
         try_symbol = mapped
     try:
-        return get_contract_id(try_symbol)
+        contract_id = get_contract_id(try_symbol)
     except Exception:
         logging.warning("Could not resolve ticker '%s'; falling back to %s", try_symbol, config.default_contract_symbol)
         return get_contract_id(config.default_contract_symbol)
+    if len(_RESOLVED_CONTRACTS) >= 64:
+        _RESOLVED_CONTRACTS.clear()
+    _RESOLVED_CONTRACTS[ticker_text] = (contract_id, today)
+    return contract_id
+
+# ── Entry failsafes (close ts / holdoff) ────────────────────────────────────────
+def _entry_suppressed(contract_id, tv_ts_ms, now_val):
+    """Return a skip response if an entry for contract_id is blocked by a recent close, else None."""
+    # FAILSAFE A (timestamp-aware): drop if entry.ts <= last_close.ts
+    last_close_ts = config.last_close_ts_ms.get(contract_id)
+    if tv_ts_ms is not None and last_close_ts is not None and tv_ts_ms <= last_close_ts:
+        logging.info("⛔ Entry suppressed by ts for %s: entry.ts=%s ≤ last_close.ts=%s",
+                     contract_id, tv_ts_ms, last_close_ts)
+        return jsonify({
+            "status": "skipped",
+            "reason": "stale_vs_close_ts",
+            "contractId": contract_id,
+            "entryTs": tv_ts_ms,
+            "lastCloseTs": last_close_ts
+        }), 200
+
+    # FAILSAFE B (time holdoff): drop entries during close holdoff window
+    until = config.close_holdoff_until_ms.get(contract_id, 0)
+    if now_val < until:
+        logging.info("⏱️ Entry suppressed by close holdoff for %s (now=%s < until=%s)",
+                     contract_id, now_val, until)
+        return jsonify({
+            "status": "skipped",
+            "reason": "in_close_holdoff",
+            "contractId": contract_id,
+            "now": now_val,
+            "holdoffUntil": until
+        }), 200
+    return None
 
 # ── Post-close quarantine to kill stragglers ───────────────────────────────────
+def _confirm_flat(token, account_id, contract_id, timeout_s=3.0):
+    """
+    One REST position check; if not flat, wait for the user hub to push flat and confirm
+    with a second REST check. Falls back to wait_until_flat polling without the hub.
+    """
+    bus = config.order_bus
+    if bus is None or not bus.is_connected():
+        return wait_until_flat(token, account_id, contract_id, timeout_s=timeout_s)
+    deadline = time.monotonic() + timeout_s
+    try:
+        if get_net_position_for_contract(token, account_id, contract_id) == 0:
+            return True, 0
+        if bus.wait_for_flat(contract_id, timeout=timeout_s):
+            net = get_net_position_for_contract(token, account_id, contract_id)
+            if net == 0:
+                return True, 0
+    except Exception:
+        logging.exception("Flat check failed for %s", contract_id)
+    # hub was stale or REST disagreed → poll for whatever time is left
+    return wait_until_flat(token, account_id, contract_id,
+                           timeout_s=max(0.0, deadline - time.monotonic()),
+                           position_event=bus.position_event)
+
 def post_close_quarantine(token, account_id, contract_id, duration_s=2.5, poll_ms=200):
+    bus = config.order_bus
+    if bus is not None and bus.is_connected():
+        total = _quarantine_via_order_bus(bus, token, account_id, contract_id, duration_s)
+    else:
+        total = _quarantine_via_polling(token, account_id, contract_id, duration_s, poll_ms)
+    logging.info("Post-close quarantine done for %s: canceled %s order(s) in %.1fs",
+                 contract_id, total, duration_s)
+
+def _quarantine_via_order_bus(bus, token, account_id, contract_id, duration_s):
+    """One REST sweep, then cancel stragglers as the user hub reports them (no polling)."""
+    end = time.monotonic() + duration_s
+    requested = set()
+    total = 0
+    try:
+        swept = cancel_for_contract(token, account_id, contract_id,
+                                    orders=search_open_orders(token, account_id),
+                                    label="Quarantine cancel")
+        requested.update(swept)
+        total += len(swept)
+    except Exception:
+        logging.exception("Quarantine sweep failed")
+
+    while True:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        oids = bus.wait_for_open_orders(contract_id, exclude=requested, timeout=remaining)
+        requested.update(oids)
+        total += len(cancel_orders(token, account_id, oids, "Quarantine cancel"))
+    return total
+
+def _quarantine_via_polling(token, account_id, contract_id, duration_s, poll_ms):
     end = time.time() + duration_s
     total = 0
     while time.time() < end:
         try:
             orders = search_open_orders(token, account_id)
-            for o in orders:
-                cid = o.get("contractId") or o.get("contract", {}).get("id")
-                if cid != contract_id:
-                    continue
-                oid = o.get("id") or o.get("orderId")
-                if not oid:
-                    continue
-                try:
-                    cancel_order(token, account_id, oid)
-                    total += 1
-                except Exception:
-                    logging.exception("Quarantine cancel failed for order %s", oid)
+            total += len(cancel_for_contract(token, account_id, contract_id, orders=orders,
+                                             label="Quarantine cancel"))
         except Exception:
             logging.exception("Quarantine poll failed")
         time.sleep(poll_ms / 1000.0)
-    logging.info("Post-close quarantine done for %s: canceled %s order(s) in %.1fs",
-                 contract_id, total, duration_s)
+    return total
 
 # ── Webhook ────────────────────────────────────────────────────────────────────
 @app.route("/webhook", methods=["POST"])
 def webhook():
 
+    # one clock read per request; shared by the pause check, close holdoff and failsafes
+    request_now_ms = now_ms()
+
     # hard block any trading during the pause window
-    if is_trading_paused():
+    if is_trading_paused(request_now_ms):
         # optional: include the raw body for debugging (keep it short in logs)
         logging.info("🛑 CME pause (16:00–18:00 ET) → ignoring webhook/trade request.")
         return jsonify({"status": "skipped", "reason": "cme_pause_window"}), 200
@@ -333,12 +439,25 @@ def webhook():
     EXIT: ignored (trailers handle exits)
     ENTRY: limit at entry, trigger at entry ± rounded(ATR_ticks)*0.25, start watcher
     """
-    # Accept either raw text body or {"message": "..."} JSON
-    body_text = request.get_data(as_text=True) or ""
-    if request.is_json:
-        data = request.get_json(silent=True) or {}
+    # Accept either raw text body or {"message": "..."} JSON (TradingView sends text/plain)
+    raw = request.get_data()
+    body_text = None
+    if request.mimetype == "application/json":
+        try:
+            data = _loads(raw) if raw else {}
+        except ValueError:
+            data = {}
         if isinstance(data, dict) and isinstance(data.get("message"), str):
             body_text = data["message"]
+    if body_text is None:
+        body_text = raw.decode("utf-8", errors="replace")
+
+    # Exit alerts are always dropped (trailers handle exits): skip the parser for them.
+    # Mirrors the close-before-exit precedence below, looking only at the comment.
+    _, has_comment, comment_tail = body_text.lower().partition("comment:")
+    if has_comment and "exit" in comment_tail and "close" not in comment_tail:
+        logging.info("Skipping webhook: comment indicates exit (fast path)")
+        return jsonify({"status": "skipped", "reason": "exit signal"}), 200
 
     try:
         parsed = parse_tv_alert(body_text)
@@ -362,15 +481,15 @@ def webhook():
         logging.exception("Contract lookup failed")
         return jsonify({"error": f"Contract lookup failed: {e}"}), 400
 
-    lock = config.per_symbol_lock[contract_id]
-    with lock:
+    lock = config.lock_for(contract_id)
 
-        # === CLOSE path: cancel watchers → cancel orders → closeContract → quarantine ===
-        if "close" in comment_lc:
+    # === CLOSE path: cancel watchers → cancel orders → closeContract → quarantine ===
+    if "close" in comment_lc:
+        with lock:
             canceled_watchers = cancel_trailing_watchers(contract_id)
 
             # holdoff & optional ts capture
-            config.close_holdoff_until_ms[contract_id] = now_ms() + config.close_holdoff_ms
+            config.close_holdoff_until_ms[contract_id] = request_now_ms + config.close_holdoff_ms
             logging.info("🧯 Close holdoff: %s until %s (ms)", contract_id, config.close_holdoff_until_ms[contract_id])
             if parsed.get("ts_ms") is not None:
                 config.last_close_ts_ms[contract_id] = parsed["ts_ms"]
@@ -389,20 +508,16 @@ def webhook():
             close_position_contract(config.topstep_token, config.account_id, contract_id, tolerate_no_position=True)
 
             # 3) Verify flat; if not flat, try one more close + verify again
-            flat, net = wait_until_flat(config.topstep_token, config.account_id, contract_id, timeout_s=3.0, poll_ms=200)
+            flat, net = _confirm_flat(config.topstep_token, config.account_id, contract_id, timeout_s=3.0)
             if not flat:
                 logging.warning("⚠Still not flat (net=%s) after first closeContract → retrying", net)
                 close_position_contract(config.topstep_token, config.account_id, contract_id, tolerate_no_position=True)
-                flat, net = wait_until_flat(config.topstep_token, config.account_id, contract_id, timeout_s=3.0, poll_ms=200)
+                flat, net = _confirm_flat(config.topstep_token, config.account_id, contract_id, timeout_s=3.0)
 
             logging.info("Close result for %s → flat=%s net=%s", contract_id, flat, net)
 
             # 4) short post-close quarantine (async)
-            threading.Thread(
-                target=post_close_quarantine,
-                args=(config.topstep_token, config.account_id, contract_id, 2.5, 200),
-                daemon=True,
-            ).start()
+            _BG.submit(post_close_quarantine, config.topstep_token, config.account_id, contract_id, 2.5, 200)
 
             return jsonify({
                 "status": "close_done",
@@ -414,73 +529,58 @@ def webhook():
                 "canceledOrderIds": canceled_ids,
             }), 200
 
-        # === EXIT path: ignore (your trailing logic handles it) ===
-        if "exit" in comment_lc:
-            logging.info("Skipping webhook: comment indicates exit → %s", comment)
-            return jsonify({"status": "skipped", "reason": "exit signal"}), 200
-
-        # === ENTRY path ===
-        if atr is None:
-            return jsonify({"error": "ATR not found; expected 'entry|atr=7' (ticks)"}), 400
-        if direction not in ("buy", "sell"):
-            return jsonify({"error": "direction must be 'buy' or 'sell'"}), 400
-        if size <= 0:
-            return jsonify({"error": "size must be > 0"}), 400
-        if entry_price <= 0:
-            return jsonify({"error": "entryPrice must be > 0"}), 400
-
-        # FAILSAFE A (timestamp-aware): drop if entry.ts <= last_close.ts
-        last_close_ts = config.last_close_ts_ms.get(contract_id)
-        if tv_ts_ms is not None and last_close_ts is not None and tv_ts_ms <= last_close_ts:
-            logging.info("⛔ Entry suppressed by ts for %s: entry.ts=%s ≤ last_close.ts=%s",
-                         contract_id, tv_ts_ms, last_close_ts)
-            return jsonify({
-                "status": "skipped",
-                "reason": "stale_vs_close_ts",
-                "contractId": contract_id,
-                "entryTs": tv_ts_ms,
-                "lastCloseTs": last_close_ts
-            }), 200
-
-        # FAILSAFE B (time holdoff): drop entries during close holdoff window
-        until = config.close_holdoff_until_ms.get(contract_id, 0)
-        now_val = now_ms()
-        if now_val < until:
-            logging.info("⏱️ Entry suppressed by close holdoff for %s (now=%s < until=%s)",
-                         contract_id, now_val, until)
-            return jsonify({
-                "status": "skipped",
-                "reason": "in_close_holdoff",
-                "contractId": contract_id,
-                "now": now_val,
-                "holdoffUntil": until
-            }), 200
+    # === EXIT path: ignore (your trailing logic handles it) ===
+    if "exit" in comment_lc:
+        logging.info("Skipping webhook: comment indicates exit → %s", comment)
+        return jsonify({"status": "skipped", "reason": "exit signal"}), 200
+
+    # === ENTRY path ===
+    if atr is None:
+        return jsonify({"error": "ATR not found; expected 'entry|atr=7' (ticks)"}), 400
+    if direction not in ("buy", "sell"):
+        return jsonify({"error": "direction must be 'buy' or 'sell'"}), 400
+    if size <= 0:
+        return jsonify({"error": "size must be > 0"}), 400
+    if entry_price <= 0:
+        return jsonify({"error": "entryPrice must be > 0"}), 400
+
+    # Cheap pre-check outside the lock so suppressed entries never wait behind a close
+    suppressed = _entry_suppressed(contract_id, tv_ts_ms, request_now_ms)
+    if suppressed is not None:
+        return suppressed
+
+    # ATR ticks → rounded ticks (half-up) → points
+    atr_ticks_raw = float(atr)
+    atr_ticks_rounded = round_half_up(atr_ticks_raw)
+    atr_points = atr_ticks_raw * config.tick_size
+
+    side = 0 if direction == "buy" else 1
+    sign = 1 if side == 0 else -1
+    entry_price = round_to_tick(entry_price)
+    trigger = round_to_tick(entry_price + sign * atr_points)
+    tag = f"{ticker}_{direction}_{time.time_ns()}"
+
+    stop_loss_raw = parsed.get("stopLoss")
+    stop_loss_px = round_to_tick(stop_loss_raw) if stop_loss_raw else None
+
+    logging.info(
+        "[%s] Parsed: dir=%s size=%s entry=%s atr_ticks(raw)=%s atr_ticks(rounded)=%s atr_points=%s "
+        "trigger=%s stop_loss=%s comment=%s",
+        tag, direction, size, entry_price, atr_ticks_raw, atr_ticks_rounded, atr_points, trigger,
+        stop_loss_px, comment
+    )
 
-        # ATR ticks → rounded ticks (half-up) → points
-        atr_ticks_raw = float(atr)
-        atr_ticks_rounded = round_half_up(atr_ticks_raw)
-        atr_points = atr_ticks_raw * config.tick_size
-
-        side = 0 if direction == "buy" else 1
-        entry_price = round_to_tick(entry_price if side == 0 else entry_price)
-        trigger = round_to_tick(entry_price + atr_points if side == 0 else entry_price - atr_points)
-        tag = f"{ticker}_{direction}_{datetime.utcnow():%Y%m%dT%H%M%S}"
-
-        stop_loss_raw = parsed.get("stopLoss")
-        stop_loss_px = round_to_tick(stop_loss_raw) if stop_loss_raw else None
-
-        logging.info(
-            "[%s] Parsed: dir=%s size=%s entry=%s atr_ticks(raw)=%s atr_ticks(rounded)=%s atr_points=%s "
-            "trigger=%s stop_loss=%s comment=%s",
-            tag, direction, size, entry_price, atr_ticks_raw, atr_ticks_rounded, atr_points, trigger,
-            stop_loss_px, comment
-        )
+    with lock:
+        # Re-check under the lock: a close may have landed while we were waiting for it
+        suppressed = _entry_suppressed(contract_id, tv_ts_ms, request_now_ms)
+        if suppressed is not None:
+            return suppressed
 
         # --- Flip-safety split: if webhook size==2 and this is a flip, market 1 first ---
         limit_size = size
+        market_leg = None
         try:
             net = get_net_position_for_contract(config.topstep_token, config.account_id, contract_id)
-            print(net)
         except Exception:
             net = 0
 
@@ -512,39 +612,42 @@ def webhook():
                     "[%s] Flip-safety: size==14 and net=%s → MARKET %s x1 now, remainder as LIMIT.",
                     tag, net, "SELL" if side == 1 else "BUY"
                 )
-                try:
-                    place_market_order(contract_id, side, 4)
-                    limit_size = 4  # place only the remainder as limit
-                except Exception:
-                    logging.exception("[%s] Market leg of flip-safety failed; continuing with limit-only.", tag)
-                    limit_size = 4  # fall back: place full limit if market leg failed
+                # Market leg runs on the API pool so its round-trip overlaps the limit POST below
+                market_leg = submit(place_market_order, contract_id, side, 4)
+                limit_size = 4  # place only the remainder as limit
 
         # Place LIMIT entry (if any remainder)
         entry_order_id = None
-        if limit_size > 0:
-            try:
-                ent = place_limit_order(contract_id, side=side, size=limit_size, price=entry_price)
-                entry_order_id = ent.get("orderId") or ent.get("id")
-                if entry_order_id is None:
-                    raise RuntimeError(f"No orderId in response: {ent}")
-            except requests.exceptions.ReadTimeout as e:
-                # Our api.py already tried to reconcile. If we got here, no matching order was found.
-                logging.error("Order submit timed out and could not be reconciled.")
-                return jsonify({"error": "timeout_unconfirmed", "detail": str(e)}), 504
-            except Exception as e:
-                logging.exception("Failed to place limit order")
-                return jsonify({"error": f"Failed to place limit order: {e}"}), 500
+        try:
+            if limit_size > 0:
+                try:
+                    ent = place_limit_order(contract_id, side=side, size=limit_size, price=entry_price)
+                    entry_order_id = ent.get("orderId") or ent.get("id")
+                    if entry_order_id is None:
+                        raise RuntimeError(f"No orderId in response: {ent}")
+                except requests.exceptions.ReadTimeout as e:
+                    # Our api.py already tried to reconcile. If we got here, no matching order was found.
+                    logging.error("Order submit timed out and could not be reconciled.")
+                    return jsonify({"error": "timeout_unconfirmed", "detail": str(e)}), 504
+                except Exception as e:
+                    logging.exception("Failed to place limit order")
+                    return jsonify({"error": f"Failed to place limit order: {e}"}), 500
+        finally:
+            if market_leg is not None:
+                try:
+                    market_leg.result()
+                except Exception:
+                    logging.exception("[%s] Market leg of flip-safety failed; continuing with limit-only.", tag)
 
         # Start trigger watcher (places trailing stop when hit)
         try:
             quote_bus = ensure_quote_bus(contract_id)
-            threading.Thread(
-                target=watch_trigger_and_place_trailer,
-                args=(quote_bus, config.topstep_token, config.account_id, contract_id,
-                      side, limit_size, entry_order_id, trigger, atr_points, tag, stop_loss_px,
-                      net),
-                daemon=True,
-            ).start()
+            # registers a quote listener and returns; no thread is held per watcher
+            watch_trigger_and_place_trailer(
+                quote_bus, config.topstep_token, config.account_id, contract_id,
+                side, limit_size, entry_order_id, trigger, atr_points, tag, stop_loss_px,
+                net, order_bus=config.order_bus,
+            )
             logging.info(
                 "[%s] Trigger watcher scheduled: trigger=%s atr_points=%s side=%s size=%s",
                 tag, trigger, atr_points, side, size
@@ -575,41 +678,61 @@ def webhook():
         }), 200
 
 def ensure_quote_bus(contract_id: str) -> 'QuoteBus':
-    if config.quote_bus is None or config.quote_bus.contract_id != contract_id:
-        config.quote_bus = QuoteBus(config.topstep_token, contract_id)
+    old = config.quote_bus
+    if old is None or old.contract_id != contract_id:
+        if old is not None:
+            old.retire()  # don't leak its hub and threads; live watchers keep it until they finish
+        config.quote_bus = _new_quote_bus(contract_id)
         config.quote_bus.start()
     return config.quote_bus
 
 # ── Bootstrapping ──────────────────────────────────────────────────────────────
-if __name__ == "__main__":
-    logging.info("Starting Trading Server…")
-
-    # Start ngrok first
-    logging.info("Initializing ngrok tunnel...")
-    ngrok_process = start_ngrok()
+def create_app() -> Flask:
+    """Authenticate, start the hub feeds and background loops, and return the Flask app.
 
+    Watchers, buses, holdoffs and per-contract locks all live in this process, so the app
+    must be served by exactly one process (threads are fine; multiple workers are not).
+    """
     # Authenticate and setup
-    config.topstep_token = authenticate_topstepx()
+    authenticate_topstepx()
     config.account_id = get_account_id()
 
+    # Order/position push feed (quarantine + flat checks react to events instead of polling)
+    config.order_bus = OrderBus(config.topstep_token, config.account_id)
+    config.order_bus.on_disconnect = _guard_wake.set
+    config.order_bus.start()
+
     # Prime default contract + quotes
     config.contract_id = get_contract_id(config.default_contract_symbol)
-    config.quote_bus = QuoteBus(config.topstep_token, config.contract_id)
+    config.quote_bus = _new_quote_bus(config.contract_id)
     config.quote_bus.start()
 
+    # keep the pooled TopstepX TLS connection warm between orders
+    start_keepalive(30)
+
     # background token refresher
-    threading.Thread(target=auth_refresher, args=(2,), daemon=True).start()
+    threading.Thread(target=auth_refresher, args=(config.auth_refresh_hours,), daemon=True).start()
 
     # background guard to stop @4pm and auto-reconnect @6pm
     threading.Thread(target=_quote_bus_guard, daemon=True).start()
 
-    # Display ngrok URL after a short delay for ngrok to start
-    def show_ngrok_url():
-        time.sleep(3)  # Give ngrok time to start
-        display_ngrok_url()
+    return app
+
+if __name__ == "__main__":
+    logging.info("Starting Trading Server…")
+
+    # Warm the TopstepX TLS connection while ngrok starts
+    prewarm_connection()
+
+    # Start ngrok first
+    logging.info("Initializing ngrok tunnel...")
+    ngrok_process = start_ngrok()
+
+    create_app()
 
-    threading.Thread(target=show_ngrok_url, daemon=True).start()
+    # Display ngrok URL once the tunnel is up (get_ngrok_url backs off while ngrok starts)
+    _BG.submit(display_ngrok_url)
 
-    # Run Flask server
+    # Run Flask server (thread per request by default; webhooks only serialize on their contract's lock)
     logging.info("Starting Flask server on port 5000...")
-    app.run(port=config.flask_port, debug=config.flask_debug, host=config.flask_host)
\ No newline at end of file
+    app.run(port=config.flask_port, debug=config.flask_debug, host=config.flask_host)
@@ -1,11 +1,9 @@
 # topstep_ws.py
 import logging
+import queue
 import threading
-from datetime import datetime
 import time
-import requests
-from zoneinfo import ZoneInfo
-from collections import defaultdict
+from collections import OrderedDict
 
 from signalrcore.hub_connection_builder import HubConnectionBuilder
 
@@ -13,14 +11,16 @@ from utils import round_half_up, round_to_tick, within_market_hours
 from api import (
     place_trailing_stop,
     cancel_order,
-    search_open_orders,
+    search_open_orders_indexed,
     get_open_positions,
     place_stop_loss_order,
     get_net_position_for_contract
 )
 
 # ── Constants ──────────────────────────────────────────────────────────────────
-EST = ZoneInfo("America/New_York")
+STALE_FEED_S = 30.0  # no trades for this long while connected in hours → resubscribe
+ORDERS_BACKOFF_MIN_MS = 500      # watcher searchOpen backoff after a 429/error, doubled per failure
+ORDERS_BACKOFF_MAX_MS = 60_000
 
 # ── Shared signalR quote hub (single connection) ───────────────────────────────
 class QuoteBus:
@@ -29,8 +29,19 @@ class QuoteBus:
         self.contract_id = contract_id
         self.hub = None
         self.connected = False
-        self.listeners = []
+        self.listeners = {}  # id(callback) -> callback
         self.last_tick_ms = 0
+        self.on_disconnect = None  # optional callable, invoked on hub close/error
+        # stale-feed watchdog: one thread per bus, re-armed by each tick bumping _last_tick
+        self._last_tick = time.monotonic()
+        self._watchdog = None
+        # listeners run on the dispatcher, off the hub's receive thread, so their REST calls never stall frames
+        self._q = queue.Queue(maxsize=1024)
+        self._dispatcher = None
+        # both threads are started by start() and exit once stop() sets this
+        self._stopped = threading.Event()
+        self._threads_lock = threading.Lock()
+        self._retired = False  # replaced by another bus; stops when its last listener detaches
 
     def set_token(self, token: str):
         """Allow external refresher to update the token used on reconnects."""
@@ -40,8 +51,8 @@ class QuoteBus:
         return bool(self.hub) and self.connected
 
     def wait_until_connected(self, timeout_s=6) -> bool:
-        end = time.time() + timeout_s
-        while time.time() < end:
+        end = time.monotonic() + timeout_s
+        while time.monotonic() < end:
             if self.is_connected():
                 return True
             time.sleep(0.2)
@@ -56,6 +67,8 @@ class QuoteBus:
             except Exception: pass
             self.hub = None
 
+        self._last_tick = time.monotonic()
+        self._arm_threads()
         self.hub = (
             HubConnectionBuilder()
             .with_url(
@@ -66,6 +79,7 @@ class QuoteBus:
             .configure_logging(logging.INFO)
             .build()
         )
+        hub = self.hub  # callbacks from a hub we've since replaced (watchdog restart) are ignored
 
         def on_open():
             self.connected = True
@@ -77,27 +91,38 @@ class QuoteBus:
             self.last_tick_ms = int(time.time()*1000)
 
         def on_close():
+            if self.hub is not hub:
+                return
             self.connected = False
             logging.info("🔌 QuoteBus disconnected for %s", self.contract_id)
             # self.hub left in place; guard thread will restart post-pause
+            self._notify_disconnect()
 
         def on_error(err):
+            if self.hub is not hub:
+                return
             self.connected = False
             logging.error("QuoteBus error: %r", err)
+            self._notify_disconnect()
 
         def on_trade(args):
             # only updates listeners during allowed hours
-            now = datetime.now(EST)
-            if not ((now.hour < 16) or (now.hour >= 18)):
+            if not within_market_hours():
                 return
             self.last_tick_ms = int(time.time()*1000)
+            self._last_tick = time.monotonic()
             _, trades = args
+            # one enqueue per frame, but every trade in order: watchers test whether a level was
+            # touched, so an intra-frame extreme must reach them, not just the last print
+            frame = []
             for t in trades:
-                p = t.get("price"); ts = t.get("timestamp") or t.get("tradeTime")
-                if p is None or ts is None: continue
-                for cb in list(self.listeners):
-                    try: cb(float(p), ts)
-                    except Exception: logging.exception("Listener error")
+                try: p = t["price"]
+                except KeyError: continue
+                ts = t.get("timestamp") or t.get("tradeTime")
+                if p is not None and ts is not None:
+                    frame.append((float(p), ts))
+            if frame:
+                self._enqueue(frame)
 
         self.hub.on_open(on_open)
         try: self.hub.on_close(on_close)
@@ -107,6 +132,208 @@ class QuoteBus:
         self.hub.on("GatewayTrade", on_trade)
         self.hub.start()
 
+    def _notify_disconnect(self):
+        if self.on_disconnect is not None:
+            try: self.on_disconnect()
+            except Exception: logging.exception("on_disconnect callback failed")
+
+    def add_listener(self, cb) -> int:
+        """Attach cb(price, ts); registering the same callback twice is a no-op. Returns its key."""
+        key = id(cb)
+        self.listeners[key] = cb
+        return key
+
+    def remove_listener(self, cb):
+        """Detach cb if attached (O(1), never raises)."""
+        self.listeners.pop(id(cb), None)
+        if self._retired and not self.listeners:
+            self.stop()
+
+    def retire(self):
+        """Stop now, or once the last listener detaches if watchers still depend on this feed."""
+        self._retired = True
+        if not self.listeners:
+            self.stop()
+
+    def _enqueue(self, item):
+        # if listeners fall 1024 frames behind, drop the oldest frame rather than the newest
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            try: self._q.get_nowait()
+            except queue.Empty: pass
+            try: self._q.put_nowait(item)
+            except queue.Full: pass
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self._q.get()]
+            try:
+                while True: batch.append(self._q.get_nowait())
+            except queue.Empty:
+                pass
+            with self._threads_lock:
+                if self._stopped.is_set():
+                    self._dispatcher = None
+                    return
+            # one listener snapshot for everything that queued up while the last batch ran
+            listeners = tuple(self.listeners.values())
+            for frame in batch:
+                if frame is None:
+                    continue  # stop() wake-up, superseded by a restart
+                for price, ts in frame:
+                    for cb in listeners:
+                        try: cb(price, ts)
+                        except Exception: logging.exception("Listener error")
+
+    def _arm_threads(self):
+        with self._threads_lock:
+            self._stopped.clear()
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch_feed, daemon=True,
+                                                  name=f"quote-watchdog-{self.contract_id}")
+                self._watchdog.start()
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True,
+                                                    name=f"quote-dispatch-{self.contract_id}")
+                self._dispatcher.start()
+
+    def _watch_feed(self):
+        """Sleeps until STALE_FEED_S after the last tick; restarts the hub if nothing arrived."""
+        while True:
+            remaining = self._last_tick + STALE_FEED_S - time.monotonic()
+            if remaining > 0:
+                self._stopped.wait(remaining)
+            with self._threads_lock:
+                if self._stopped.is_set():
+                    self._watchdog = None
+                    return
+            if remaining > 0:
+                continue  # a tick moved the deadline while we slept
+            if self.is_connected() and within_market_hours():
+                logging.warning("🩺 No ticks in %ss → restarting QuoteBus", int(STALE_FEED_S))
+                try:
+                    self._close_hub()
+                    self.start()
+                except Exception:
+                    logging.exception("QuoteBus watchdog restart failed")
+                    self._notify_disconnect()
+            self._last_tick = time.monotonic()  # give the (re)connect a full window
+
+    def _close_hub(self):
+        try:
+            if self.hub:
+                self.hub.stop()
+        finally:
+            self.hub = None
+            self.connected = False
+            # keep listeners; they'll be reused on reconnect
+
+    def stop(self):
+        """Stop and mark disconnected; the watchdog and dispatcher threads exit (start() re-arms them)."""
+        self._stopped.set()
+        self._enqueue(None)  # wake the dispatcher
+        self._close_hub()
+
+# ── Shared signalR user hub (orders/positions push) ────────────────────────────
+ORDER_STATUS_OPEN = (1, 6)  # Open, Pending
+CLOSED_ORDERS_MAX = 1024     # recently closed ids kept so late order_event() callers still see them
+
+
+class OrderBus:
+    """
+    Live view of the account's working orders and positions from the user hub.
+
+    Only orders/positions that change after subscription are known here, so
+    callers keep a REST call as the authority and use the bus to react to
+    updates instead of polling.
+    """
+
+    def __init__(self, token: str, account_id: int):
+        self.token = token
+        self.account_id = account_id
+        self.hub = None
+        self.connected = False
+        self.open_orders: dict[int, dict] = {}   # order id -> order, open/pending only
+        self.positions: dict[str, int] = {}      # contract id -> signed net size
+        self.position_event = threading.Event()  # set on every position update
+        self.on_disconnect = None  # optional callable, invoked on hub close/error
+        self.connects = 0  # bumped on every (re)connect; pushes may have been missed in between
+        self._cond = threading.Condition()
+        self._order_events: dict[int, threading.Event] = {}  # order id -> set once it leaves open
+        self._closed_orders = OrderedDict()                  # order id -> final status
+
+    def set_token(self, token: str):
+        """Allow external refresher to update the token used on reconnects."""
+        self.token = token
+
+    def is_connected(self) -> bool:
+        return bool(self.hub) and self.connected
+
+    def start(self):
+        # safe to call repeatedly
+        if self.hub and self.connected:
+            return
+        if self.hub and not self.connected:
+            try: self.hub.stop()
+            except Exception: pass
+            self.hub = None
+
+        self.hub = (
+            HubConnectionBuilder()
+            .with_url(
+                f"wss://rtc.topstepx.com/hubs/user?access_token={self.token}",
+                options={"access_token_factory": lambda: self.token,
+                         "skip_negotiation": True, "transport": "websockets"},
+            )
+            .configure_logging(logging.INFO)
+            .build()
+        )
+        hub = self.hub  # callbacks from a hub we've since replaced are ignored
+
+        def on_open():
+            if self.hub is not hub:
+                return
+            logging.info("✅ OrderBus connected; subscribing account %s", self.account_id)
+            try:
+                hub.send("SubscribeOrders", [self.account_id])
+                hub.send("SubscribePositions", [self.account_id])
+            except Exception:
+                # not live without both subscriptions; stay disconnected so the guard restarts us
+                logging.exception("OrderBus subscribe failed")
+                self._notify_disconnect()
+                return
+            self.connects += 1
+            self.connected = True
+
+        def on_close():
+            if self.hub is not hub:
+                return
+            self.connected = False
+            logging.info("🔌 OrderBus disconnected for account %s", self.account_id)
+            self._notify_disconnect()
+
+        def on_error(err):
+            if self.hub is not hub:
+                return
+            self.connected = False
+            logging.error("OrderBus error: %r", err)
+            self._notify_disconnect()
+
+        self.hub.on_open(on_open)
+        try: self.hub.on_close(on_close)
+        except Exception: pass
+        try: self.hub.on_error(on_error)
+        except Exception: pass
+        self.hub.on("GatewayUserOrder", self._on_order)
+        self.hub.on("GatewayUserPosition", self._on_position)
+        self.hub.start()
+
+    def _notify_disconnect(self):
+        if self.on_disconnect is not None:
+            try: self.on_disconnect()
+            except Exception: logging.exception("on_disconnect callback failed")
+
     def stop(self):
         """Stop and mark disconnected."""
         try:
@@ -115,29 +342,159 @@ class QuoteBus:
         finally:
             self.hub = None
             self.connected = False
-            # keep listeners list; they'll be reused on reconnect
+
+    @staticmethod
+    def _payloads(args):
+        # events arrive either as the entity itself or wrapped as {"action": .., "data": {...}}
+        for item in (args if isinstance(args, list) else [args]):
+            if isinstance(item, dict):
+                yield item.get("data", item)
+
+    def _on_order(self, args):
+        with self._cond:
+            for o in self._payloads(args):
+                oid = o.get("id") or o.get("orderId")
+                if oid is None:
+                    continue
+                if o.get("status") in ORDER_STATUS_OPEN:
+                    self.open_orders[oid] = o
+                else:
+                    self.open_orders.pop(oid, None)
+                    self._closed_orders[oid] = o.get("status")
+                    if len(self._closed_orders) > CLOSED_ORDERS_MAX:
+                        self._closed_orders.popitem(last=False)
+                    ev = self._order_events.pop(oid, None)
+                    if ev is not None:
+                        ev.set()
+            self._cond.notify_all()
+
+    def _on_position(self, args):
+        with self._cond:
+            for p in self._payloads(args):
+                cid = p.get("contractId")
+                if cid is None:
+                    continue
+                size = int(p.get("size") or 0)
+                self.positions[cid] = -size if p.get("type") == 2 else size  # 1=long, 2=short
+            self._cond.notify_all()
+        self.position_event.set()
+
+    def wait_for_open_orders(self, contract_id: str, exclude=(), timeout: float = 0.0) -> list:
+        """
+        Block until an open order for the contract (not in `exclude`) is known, or timeout.
+
+        Returns:
+            List of matching open order IDs (empty on timeout)
+        """
+        def _pending():
+            return [oid for oid, o in self.open_orders.items()
+                    if o.get("contractId") == contract_id and oid not in exclude]
+
+        with self._cond:
+            self._cond.wait_for(_pending, timeout=timeout)
+            return _pending()
+
+    def order_event(self, order_id: int) -> threading.Event:
+        """Event that is set once the order leaves open/pending (filled, canceled or rejected)."""
+        with self._cond:
+            ev = self._order_events.get(order_id)
+            if ev is None:
+                ev = threading.Event()
+                if order_id in self._closed_orders:
+                    ev.set()
+                else:
+                    self._order_events[order_id] = ev
+            return ev
+
+    def discard_order_event(self, order_id: int):
+        with self._cond:
+            self._order_events.pop(order_id, None)
+
+    def wait_for_flat(self, contract_id: str, timeout: float = 0.0) -> bool:
+        """Block until the hub reports the contract's net position as 0, or timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.positions.get(contract_id) == 0, timeout=timeout)
+
+
+# ── Net position shared across watchers (grace confirms poll it every 100ms) ──
+POSITION_CACHE_TTL_S = 0.2
+_pos_cache: dict[tuple, tuple[float, int]] = {}  # (account_id, contract_id) -> (monotonic ts, net)
+_pos_lock = threading.Lock()
+
+def _cached_net_position(token: str, account_id: int, contract_id: str) -> int:
+    key = (account_id, contract_id)
+    now = time.monotonic()
+    hit = _pos_cache.get(key)
+    if hit and now - hit[0] < POSITION_CACHE_TTL_S:
+        return hit[1]
+    net = get_net_position_for_contract(token, account_id, contract_id)
+    with _pos_lock:
+        _pos_cache[key] = (now, net)
+    return net
+
+def _invalidate_net_position(account_id: int, contract_id: str):
+    with _pos_lock:
+        _pos_cache.pop((account_id, contract_id), None)
 
 # ── Watcher registry so we can cancel on 'close' ───────────────────────────────
-ACTIVE_WATCHERS = defaultdict(list)  # contract_id -> list of {bus, listener, done, tag}
+ACTIVE_WATCHERS: dict[str, dict] = {}  # contract_id -> {id(listener): {bus, listener, done, tag, deadline, finish}}
+_WATCHERS_LOCK = threading.Lock()
+WATCHER_MAX_LIFE_S = 8 * 3600   # safety auto-stop for watchers that never trigger
+WATCHER_SWEEP_S = 30
+_janitor = None
+
+def _register_watcher(contract_id: str, key: int, watcher: dict):
+    global _janitor
+    with _WATCHERS_LOCK:
+        ACTIVE_WATCHERS.setdefault(contract_id, {})[key] = watcher
+        if _janitor is None:
+            _janitor = threading.Thread(target=_janitor_loop, daemon=True, name="watcher-janitor")
+            _janitor.start()
+
+def _unregister_watcher(contract_id: str, key: int):
+    with _WATCHERS_LOCK:
+        arr = ACTIVE_WATCHERS.get(contract_id)
+        if arr is not None:
+            arr.pop(key, None)
+            if not arr:
+                del ACTIVE_WATCHERS[contract_id]
+
+def expire_watchers(now: float | None = None) -> int:
+    """Finish watchers past their safety deadline. Returns number expired."""
+    now = time.monotonic() if now is None else now
+    with _WATCHERS_LOCK:
+        expired = [w for arr in ACTIVE_WATCHERS.values() for w in arr.values() if w["deadline"] <= now]
+    for w in expired:
+        logging.info("[%s] ⏰ Watcher reached its %dh safety stop", w["tag"], WATCHER_MAX_LIFE_S // 3600)
+        try:
+            w["finish"]()
+        except Exception:
+            logging.exception("Error expiring watcher %s", w["tag"])
+    return len(expired)
+
+def _janitor_loop():
+    # one thread enforces every watcher's deadline; watchers themselves hold no thread
+    while True:
+        time.sleep(WATCHER_SWEEP_S)
+        try:
+            expire_watchers()
+        except Exception:
+            logging.exception("Watcher janitor failed")
 
 def cancel_trailing_watchers(contract_id: str) -> int:
     """
     Cancel (detach) all trailing trigger watchers for a contract_id.
     Returns number canceled and logs it.
     """
-    arr = ACTIVE_WATCHERS.get(contract_id, [])
+    with _WATCHERS_LOCK:
+        arr = ACTIVE_WATCHERS.pop(contract_id, {})
     count = 0
-    for w in arr:
+    for w in arr.values():
         try:
-            w["done"].set()
-            try:
-                w["bus"].listeners.remove(w["listener"])
-            except ValueError:
-                pass
+            w["finish"]()
             count += 1
         except Exception:
             logging.exception("Error canceling watcher for %s", contract_id)
-    ACTIVE_WATCHERS[contract_id] = []
     logging.info("🧹 Canceled %d trailing watcher(s) for %s", count, contract_id)
     return count
 
@@ -154,7 +511,8 @@ def watch_trigger_and_place_trailer(
     atr_points: float,   # ticks→points
     tag: str,
     stop_loss_price: float | None = None,
-    baseline_net: int = 0
+    baseline_net: int = 0,
+    order_bus: "OrderBus | None" = None
 ):
 
     stop_side = 1 - side
@@ -165,9 +523,34 @@ def watch_trigger_and_place_trailer(
     last_orders_check_ms = 0
     orders_check_interval_ms = 500
     orders_backoff_until_ms = 0
+    rate_backoff_ms = error_backoff_ms = ORDERS_BACKOFF_MIN_MS
+
+    # Prefer user-hub pushes for the entry's fill; REST polling only while the hub can't be trusted
+    fill_event = order_bus.order_event(entry_order_id) if order_bus is not None and entry_order_id is not None else None
+    bus_session = order_bus.connects if fill_event is not None else None
+
+    def _bus_live() -> bool:
+        return fill_event is not None and order_bus.is_connected() and order_bus.connects == bus_session
 
     def _now_ms():
-        return int(time.time() * 1000)
+        return time.monotonic_ns() // 1_000_000  # only compared with itself
+
+    def _orders_ok():
+        nonlocal rate_backoff_ms, error_backoff_ms
+        rate_backoff_ms = error_backoff_ms = ORDERS_BACKOFF_MIN_MS
+
+    def _orders_failed(e: Exception, where: str):
+        """Push the next searchOpen out, doubling separately for 429s and other failures."""
+        nonlocal orders_backoff_until_ms, rate_backoff_ms, error_backoff_ms
+        resp = getattr(e, "response", None)
+        if resp is not None and resp.status_code == 429:
+            delay, rate_backoff_ms = rate_backoff_ms, min(rate_backoff_ms * 2, ORDERS_BACKOFF_MAX_MS)
+            reason = "rate-limited"
+        else:
+            delay, error_backoff_ms = error_backoff_ms, min(error_backoff_ms * 2, ORDERS_BACKOFF_MAX_MS)
+            reason = f"failed ({e!r})"
+        orders_backoff_until_ms = _now_ms() + delay
+        logging.warning("[%s] searchOpen %s during %s → backing off %dms", tag, reason, where, delay)
 
     static_stop_id = None  # broker stop id, once placed after fill
     trailing_order_id = None  # id after we place trailing stop
@@ -179,21 +562,21 @@ def watch_trigger_and_place_trailer(
 
     def _entry_open_now() -> bool:
         """Check if the entry order is still in open orders."""
+        if fill_event is not None and fill_event.is_set():
+            return False
+        if _now_ms() < orders_backoff_until_ms:
+            return True  # backing off → assume still open until the next try
         try:
-            open_orders = search_open_orders(token, account_id)
-            return any(
-                (o.get("id") == entry_order_id or o.get("orderId") == entry_order_id) and int(o.get("type", -1)) == 1
-                for o in open_orders
-            )
-        except requests.HTTPError as e:
-            if getattr(e, "response", None) is not None and e.response.status_code == 429:
-                return True  # rate-limited → assume still open until next tick
-            logging.exception("[%s] searchOpen failed during _entry_open_now", tag)
+            o = search_open_orders_indexed(token, account_id).get(entry_order_id)
+        except Exception as e:
+            _orders_failed(e, "_entry_open_now")
             return True
+        _orders_ok()
+        return o is not None and int(o.get("type", -1)) == 1
 
     def _position_net() -> int:
         try:
-            return get_net_position_for_contract(token, account_id, contract_id)
+            return _cached_net_position(token, account_id, contract_id)
         except Exception:
             logging.exception("[%s] get_net_position_for_contract failed", tag)
             return baseline_net
@@ -203,75 +586,114 @@ def watch_trigger_and_place_trailer(
         Return True if we confirm a fill within the window by either:
           • entry order disappears from open orders, OR
           • net position != baseline (indicates a fill landed).
+        With a live user hub this waits on the fill push, then makes one REST check.
         """
-        deadline = time.time() + timeout_s
-        while time.time() < deadline:
+        if _bus_live():
+            if fill_event.wait(timeout_s):
+                logging.info("[%s] ✅ Grace confirm: fill pushed by user hub", tag)
+                return True
+            timeout_s = 0.0  # no push → one authoritative REST check below
+        deadline = time.monotonic() + timeout_s
+        while True:
             still_open = _entry_open_now()
             net_now = _position_net()
             if (not still_open) or (net_now != baseline_net and abs(net_now) >= 1):
                 logging.info("[%s] ✅ Grace confirm: filled detected (open=%s, net=%s, baseline=%s)",
                              tag, still_open, net_now, baseline_net)
+                _invalidate_net_position(account_id, contract_id)  # the fill moved it; don't serve it to others
                 return True
+            if time.monotonic() >= deadline:
+                return False
             time.sleep(poll_ms / 1000.0)
-        return False
+
+    def _place_static_stop_once():
+        """Place the static stop at stop_loss_price unless there is none or it's already placed."""
+        nonlocal static_stop_id
+        if static_stop_id is not None or stop_loss_price is None:
+            return
+        try:
+            resp = place_stop_loss_order(token, account_id, contract_id, stop_side, size, stop_loss_price)
+            static_stop_id = resp.get("orderId") or resp.get("id")
+            logging.info("[%s] 🧷 Static stop placed @ %s (id=%s)", tag, stop_loss_price, static_stop_id)
+        except Exception:
+            logging.exception("[%s] Failed to place static stop @ %s", tag, stop_loss_price)
+
+    def _cancel_if_present(order_id, label: str) -> bool:
+        """Cancel order_id if set, logging (not raising) failures. Returns True if canceled."""
+        if not order_id:
+            return False
+        try:
+            cancel_order(token, account_id, order_id)
+            return True
+        except Exception:
+            logging.exception("[%s] Failed to cancel %s %s", tag, label, order_id)
+            return False
+
+    # Side-specialized levels, fixed for the watcher's life
+    if side == 0:
+        trigger_crossed = lambda lp: lp >= trigger_price
+        stop_touched = (lambda lp: lp <= stop_loss_price) if stop_loss_price is not None else (lambda lp: False)
+        atr_adj = -atr_points + 0.25
+    else:
+        trigger_crossed = lambda lp: lp <= trigger_price
+        stop_touched = (lambda lp: lp >= stop_loss_price) if stop_loss_price is not None else (lambda lp: False)
+        atr_adj = atr_points - 0.25
 
     def _listener(last_price: float, ts: str):
         nonlocal entry_still_open, last_orders_check_ms, orders_backoff_until_ms
-        nonlocal static_stop_id, trailing_order_id
+        nonlocal static_stop_id, trailing_order_id, bus_session
         if done.is_set():
             return
 
-        # --- 0) Throttled check: did our entry leave open orders? (→ filled or canceled) ---
+        crossed = trigger_crossed(last_price)
+        stop_hit = stop_touched(last_price)
+        # Quiet tick: no level touched, and no static stop waiting on the entry's fill → nothing to do.
+        # (While a static stop is pending the fill check below must keep running every tick.)
+        if not (crossed or stop_hit) and (static_stop_id is not None or stop_loss_price is None):
+            return
+
+        # --- 0) Did our entry leave open orders? (→ filled or canceled) ---
         now_ms = _now_ms()
-        if now_ms >= orders_backoff_until_ms and (now_ms - last_orders_check_ms) >= orders_check_interval_ms:
+        if _bus_live():
+            if fill_event.is_set():
+                entry_still_open = False
+        elif now_ms >= orders_backoff_until_ms and (now_ms - last_orders_check_ms) >= orders_check_interval_ms:
+            # hub down or reconnected since we last looked (pushes may be missed) → poll REST
             last_orders_check_ms = now_ms
+            session = order_bus.connects if fill_event is not None else None
             try:
-                open_orders = search_open_orders(token, account_id)
-                entry_still_open = any(
-                    (o.get("id") == entry_order_id or o.get("orderId") == entry_order_id) and o.get("type") == 1
-                    for o in open_orders
-                )
-            except requests.HTTPError as e:
-                if getattr(e, "response", None) is not None and e.response.status_code == 429:
-                    orders_backoff_until_ms = now_ms + 3000  # 3s backoff
-                else:
-                    logging.exception("[%s] searchOpen failed", tag)
+                o = search_open_orders_indexed(token, account_id).get(entry_order_id)
+                entry_still_open = o is not None and int(o.get("type", -1)) == 1
+                if fill_event is not None and order_bus.is_connected():
+                    bus_session = session  # REST is caught up; pushes from this session onward cover us
+                _orders_ok()
+            except Exception as e:
+                _orders_failed(e, "tick check")
 
         # If entry has filled (not found in open orders) and we have a stop level but no static stop yet → place it
-        if not entry_still_open and stop_loss_price is not None and static_stop_id is None:
-            try:
-                resp = place_stop_loss_order(token, account_id, contract_id, stop_side, size, stop_loss_price)
-                static_stop_id = resp.get("orderId") or resp.get("id")
-                logging.info("[%s] 🧷 Static stop placed @ %s (id=%s)", tag, stop_loss_price, static_stop_id)
-            except Exception:
-                logging.exception("[%s] Failed to place static stop @ %s", tag, stop_loss_price)
+        if not entry_still_open:
+            _place_static_stop_once()
 
         # --- 1) If stop level touched before trigger, kill trailer path and clean up ---
-        if stop_loss_price is not None:
-            stop_hit = (side == 0 and last_price <= stop_loss_price) or (side == 1 and last_price >= stop_loss_price)
-            if stop_hit:
-                logging.info("[%s] ⛔ Stop level touched %s (last=%s) → cancel trailer watcher.", tag, stop_loss_price,
-                             last_price)
-                # if entry still open, cancel it so it can't fill after the stop
-                if entry_still_open:
-                    try:
-                        cancel_order(token, account_id, entry_order_id)
-                        logging.info("[%s] Canceled still-open entry limit %s", tag, entry_order_id)
-                    except Exception:
-                        logging.exception("[%s] Failed to cancel entry %s", tag, entry_order_id)
-                # if we somehow placed a trailing stop already, cancel it (keep static stop in charge)
-                if trailing_order_id:
-                    try:
-                        cancel_order(token, account_id, trailing_order_id)
-                        logging.info("[%s] Canceled trailing stop %s", tag, trailing_order_id)
-                    except Exception:
-                        logging.exception("[%s] Failed to cancel trailing %s", tag, trailing_order_id)
-                done.set()
-                return
+        if stop_hit:
+            logging.info("[%s] ⛔ Stop level touched %s (last=%s) → cancel trailer watcher.", tag, stop_loss_price,
+                         last_price)
+            if entry_still_open:
+                # a missed fill push would leave this stale → confirm over REST before canceling
+                entry_still_open = _entry_open_now()
+                if not entry_still_open:
+                    _place_static_stop_once()
+            # if entry still open, cancel it so it can't fill after the stop
+            if entry_still_open and _cancel_if_present(entry_order_id, "entry"):
+                logging.info("[%s] Canceled still-open entry limit %s", tag, entry_order_id)
+            # if we somehow placed a trailing stop already, cancel it (keep static stop in charge)
+            if _cancel_if_present(trailing_order_id, "trailing"):
+                logging.info("[%s] Canceled trailing stop %s", tag, trailing_order_id)
+            _finish()
+            return
 
         # --- 2) Trigger logic ---
-        hit = (side == 0 and last_price >= trigger_price) or (side == 1 and last_price <= trigger_price)
-        if not hit:
+        if not crossed:
             return
 
         logging.info("[%s] 🔔 Trigger condition met: last=%s trigger=%s", tag, last_price, trigger_price)
@@ -279,59 +701,44 @@ def watch_trigger_and_place_trailer(
         # ---- GRACE CONFIRM FILL BEFORE CANCEL ----
         if entry_still_open:
             if _grace_confirm_fill(timeout_s=2.0, poll_ms=100):
-                entry_still_open_local = _entry_open_now()
-                if not entry_still_open_local and stop_loss_price is not None and static_stop_id is None:
-                    try:
-                        resp = place_stop_loss_order(token, account_id, contract_id, stop_side, size, stop_loss_price)
-                        static_stop_id = resp.get("orderId") or resp.get("id")
-                        logging.info("[%s] 🧷 Static stop placed @ %s (id=%s)", tag, stop_loss_price, static_stop_id)
-                    except Exception:
-                        logging.exception("[%s] Failed to place static stop after grace", tag)
+                if not _entry_open_now():
+                    _place_static_stop_once()
                 # Fall through to trailing placement
             else:
                 # Still looks unfilled after grace window → cancel and exit
-                try:
-                    cancel_order(token, account_id, entry_order_id)
+                if _cancel_if_present(entry_order_id, "entry"):
                     logging.warning("[%s] Trigger hit but limit not filled (after grace) → canceled %s",
                                     tag, entry_order_id)
-                except Exception:
-                    logging.exception("[%s] Failed to cancel entry %s", tag, entry_order_id)
-                done.set()
+                _finish()
                 return
 
         # Assume filled → place trailing stop
-        trail_price = round_to_tick(last_price - atr_points + 0.25 if side == 0 else last_price + atr_points - 0.25)
+        trail_price = round_to_tick(last_price + atr_adj)
         resp = place_trailing_stop(token, account_id, contract_id, stop_side, size, trail_price)
         trailing_order_id = resp.get("orderId") or resp.get("id")
 
         # Replace static stop with trailing
-        if static_stop_id:
-            try:
-                cancel_order(token, account_id, static_stop_id)
-                logging.info("[%s] Replaced static stop (id=%s) with trailing (id=%s @ %s)",
-                             tag, static_stop_id, trailing_order_id, trail_price)
-                static_stop_id = None
-            except Exception:
-                logging.exception("[%s] Failed to cancel static stop %s after trailing", tag, static_stop_id)
+        if _cancel_if_present(static_stop_id, "static stop"):
+            logging.info("[%s] Replaced static stop (id=%s) with trailing (id=%s @ %s)",
+                         tag, static_stop_id, trailing_order_id, trail_price)
+            static_stop_id = None
 
         logging.info("[%s] 🎯 Trigger HIT @ %s → trailing stop @ %s (id=%s, offset≈%s pts)",
                      tag, last_price, trail_price, trailing_order_id, atr_points)
-        done.set()
+        _finish()
 
-    # register & attach listener
-    ACTIVE_WATCHERS[contract_id].append({"bus": quote_bus, "listener": _listener, "done": done, "tag": tag})
-    quote_bus.listeners.append(_listener)
-
-    # keep alive until canceled or finished
-    done.wait(timeout=60 * 60 * 8)  # safety auto-stop after 8h
-
-    # detach & cleanup
-    try:
-        quote_bus.listeners.remove(_listener)
-    except ValueError:
-        pass
-    try:
-        lst = ACTIVE_WATCHERS.get(contract_id, [])
-        ACTIVE_WATCHERS[contract_id] = [w for w in lst if w["listener"] is not _listener]
-    except Exception:
-        pass
\ No newline at end of file
+    def _finish():
+        """Mark done and detach everything this watcher registered (idempotent)."""
+        done.set()
+        quote_bus.remove_listener(_listener)
+        if fill_event is not None:
+            order_bus.discard_order_event(entry_order_id)
+        _unregister_watcher(contract_id, key)
+
+    # register & attach listener; returns at once (the janitor enforces the safety deadline)
+    # (registry first, so a listener that finishes on its first tick can't leave an entry behind)
+    key = id(_listener)
+    _register_watcher(contract_id, key, {"bus": quote_bus, "listener": _listener, "done": done, "tag": tag,
+                                         "deadline": time.monotonic() + WATCHER_MAX_LIFE_S,
+                                         "finish": _finish})
+    quote_bus.add_listener(_listener)
@@ -1,18 +1,20 @@
 # utils.py
 """Shared utility functions for trading bot"""
+import math
+import random
 import time
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 
 # Constants
-EST = pytz.timezone("America/New_York")
+EST = ZoneInfo("America/New_York")
 TICK_SIZE = 0.25  # NQ tick size
 
 
-def round_half_up(x: float) -> int:
+def round_half_up(x: float, exact: bool = False) -> int:
     """
-    Round to nearest integer using half-up rounding.
+    Round to nearest integer using half-up rounding (halves away from zero).
 
     Examples:
         7.25 → 7
@@ -21,11 +23,15 @@ def round_half_up(x: float) -> int:
 
     Args:
         x: Number to round
+        exact: Round the decimal repr via Decimal instead of float math; only
+            differs for values within an ULP of a half (e.g. 0.49999999999999994)
 
     Returns:
         Rounded integer
     """
-    return int(Decimal(str(x)).to_integral_value(rounding=ROUND_HALF_UP))
+    if exact:
+        return int(Decimal(str(x)).to_integral_value(rounding=ROUND_HALF_UP))
+    return math.floor(x + 0.5) if x >= 0 else -math.floor(0.5 - x)
 
 
 def round_to_tick(price: float, tick_size: float = TICK_SIZE) -> float:
@@ -39,8 +45,43 @@ def round_to_tick(price: float, tick_size: float = TICK_SIZE) -> float:
     Returns:
         Price rounded to nearest tick
     """
-    ticks = round(price / tick_size)
-    return float(f"{ticks * tick_size:.2f}")
+    if tick_size == TICK_SIZE:
+        # 0.25 is a power of two: scaling and the product are exact in binary
+        return round(price * 4) * 0.25
+    return round(round(price / tick_size) * tick_size, 2)
+
+
+def backoff_delay(attempt: int, base: float = 0.1, cap: float = 2.0) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay scale for the first attempt (seconds)
+        cap: Maximum delay (seconds)
+
+    Returns:
+        Seconds to sleep, uniform in [0, min(cap, base * 2**attempt)]
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+_et_hour_slot = (-1, 0)  # (epoch minute, ET hour); ET offsets are whole hours, so minutes align
+
+
+def current_et_hour() -> int:
+    """
+    Current hour in ET, recomputed at most once per wall-clock minute.
+
+    Returns:
+        Hour of day (0-23) in America/New_York
+    """
+    global _et_hour_slot
+    slot = int(time.time()) // 60
+    cached = _et_hour_slot
+    if cached[0] != slot:
+        cached = _et_hour_slot = (slot, datetime.now(EST).hour)
+    return cached[1]
 
 
 def within_market_hours(now: datetime = None) -> bool:
@@ -55,25 +96,46 @@ def within_market_hours(now: datetime = None) -> bool:
     Returns:
         True if markets are open (not in 4-6pm pause)
     """
-    now = now or datetime.now(EST)
+    hour = now.hour if now is not None else current_et_hour()
     # Not paused if before 4pm or after 6pm
-    return now.hour < 16 or now.hour >= 18
+    return hour < 16 or hour >= 18
 
 
-def is_trading_paused(now: datetime = None) -> bool:
+def is_trading_paused(now=None) -> bool:
     """
     Returns True during the CME equity daily pause (16:00–18:00 ET).
 
     Args:
-        now: Current time (default: now in ET)
+        now: Current time as a datetime or epoch milliseconds (default: now in ET)
 
     Returns:
         True if in daily trading pause
     """
-    now = now or datetime.now(EST)
+    if now is None:
+        return 16 <= current_et_hour() < 18
+    if not isinstance(now, datetime):
+        now = datetime.fromtimestamp(now / 1000, EST)
     return 16 <= now.hour < 18
 
 
+def seconds_until_pause_edge(now: datetime = None) -> float:
+    """
+    Seconds until the next CME daily pause boundary (16:00 or 18:00 ET).
+
+    Args:
+        now: Current time (default: now in ET)
+
+    Returns:
+        Seconds until the pause starts or ends, whichever comes first
+    """
+    now = now or datetime.now(EST)
+    secs = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+    for edge in (16 * 3600, 18 * 3600):
+        if secs < edge:
+            return edge - secs
+    return 16 * 3600 + 24 * 3600 - secs
+
+
 def now_ms() -> int:
     """
     Get current time in milliseconds since epoch.